@@ -9,7 +9,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.config import settings
-from src.models import Base
+from src.database import Base
+from src import models  # noqa: F401  (registers tables on Base.metadata)
 
 # this is the Alembic Config object
 config = context.config
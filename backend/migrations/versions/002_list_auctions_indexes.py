@@ -0,0 +1,47 @@
+"""Composite partial indexes for the list_auctions filter combinations."""
+from alembic import op
+
+# revision identifiers
+revision = '002_list_auctions_indexes'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Default listing: active auctions ordered by score. INCLUDE columns
+        # let the price/city/type filters be checked without heap fetches.
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_score "
+            "ON auctions (ai_score DESC NULLS LAST) "
+            "INCLUDE (base_price, city, property_type) "
+            "WHERE status = 'ACTIVE'"
+        )
+        # City-filtered pages
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_city_score "
+            "ON auctions (city, ai_score DESC NULLS LAST) "
+            "WHERE status = 'ACTIVE'"
+        )
+        # Property-type-filtered pages
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_type_score "
+            "ON auctions (property_type, ai_score DESC NULLS LAST) "
+            "WHERE status = 'ACTIVE'"
+        )
+
+        # Superseded by the composite indexes above
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_ai_score")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_city")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_city ON auctions (city)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_ai_score ON auctions (ai_score)")
+
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_active_type_score")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_active_city_score")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_active_score")
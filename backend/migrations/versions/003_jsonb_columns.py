@@ -0,0 +1,57 @@
+"""Store JSON documents as JSONB and index search preference filters."""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '003_jsonb_columns'
+down_revision = '002_list_auctions_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        'search_preferences', 'filters',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='filters::jsonb'
+    )
+    op.alter_column(
+        'auctions', 'raw_data',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='raw_data::jsonb'
+    )
+    op.alter_column(
+        'auctions', 'score_breakdown',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='score_breakdown::jsonb'
+    )
+
+    # jsonb_path_ops only supports containment (@>) but is much smaller and
+    # faster than the default jsonb_ops for that query shape
+    op.create_index(
+        'ix_pref_filters_gin',
+        'search_preferences',
+        [sa.text('filters jsonb_path_ops')],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pref_filters_gin', table_name='search_preferences')
+
+    op.alter_column(
+        'auctions', 'score_breakdown',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='score_breakdown::json'
+    )
+    op.alter_column(
+        'auctions', 'raw_data',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='raw_data::json'
+    )
+    op.alter_column(
+        'search_preferences', 'filters',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='filters::json'
+    )
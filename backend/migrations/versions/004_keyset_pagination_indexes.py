@@ -0,0 +1,46 @@
+"""Add id as keyset tiebreaker to the list_auctions partial indexes."""
+from alembic import op
+
+# revision identifiers
+revision = '004_keyset_pagination_indexes'
+down_revision = '003_jsonb_columns'
+branch_labels = None
+depends_on = None
+
+
+def _rebuild_indexes(tiebreaker):
+    # Build the replacements under temporary names first so listing queries
+    # always have an index to use, then swap them in.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_score_new "
+            f"ON auctions (ai_score DESC NULLS LAST{tiebreaker}) "
+            "INCLUDE (base_price, city, property_type) "
+            "WHERE status = 'ACTIVE'"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_city_score_new "
+            f"ON auctions (city, ai_score DESC NULLS LAST{tiebreaker}) "
+            "WHERE status = 'ACTIVE'"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_active_type_score_new "
+            f"ON auctions (property_type, ai_score DESC NULLS LAST{tiebreaker}) "
+            "WHERE status = 'ACTIVE'"
+        )
+
+        for name in (
+            'ix_auctions_active_score',
+            'ix_auctions_active_city_score',
+            'ix_auctions_active_type_score',
+        ):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade():
+    _rebuild_indexes(", id DESC")
+
+
+def downgrade():
+    _rebuild_indexes("")
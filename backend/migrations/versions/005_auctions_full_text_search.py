@@ -0,0 +1,30 @@
+"""Generated tsvector column with GIN index for auction text search."""
+from alembic import op
+
+# revision identifiers
+revision = '005_auctions_full_text_search'
+down_revision = '004_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE auctions ADD COLUMN tsv tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('italian', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('italian', coalesce(city, '')), 'B') ||
+            setweight(to_tsvector('italian', coalesce(address, '')), 'C') ||
+            setweight(to_tsvector('italian', coalesce(description, '')), 'D')
+        ) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_tsv "
+            "ON auctions USING gin (tsv)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_tsv")
+    op.drop_column('auctions', 'tsv')
@@ -0,0 +1,29 @@
+"""Store auction coordinates as geography(POINT, 4326)."""
+from alembic import op
+
+# revision identifiers
+revision = '006_coordinates_geography'
+down_revision = '005_auctions_full_text_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The GIST operator class differs between geometry and geography
+    op.execute("DROP INDEX IF EXISTS idx_auctions_coordinates")
+    op.execute(
+        "ALTER TABLE auctions ALTER COLUMN coordinates TYPE geography(POINT, 4326) "
+        "USING coordinates::geography"
+    )
+    op.execute("CREATE INDEX idx_auctions_coordinates ON auctions USING GIST (coordinates)")
+    # If nearby lookups dominate, `CLUSTER auctions USING idx_auctions_coordinates`
+    # keeps neighbouring points on the same pages (takes an exclusive lock).
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_auctions_coordinates")
+    op.execute(
+        "ALTER TABLE auctions ALTER COLUMN coordinates TYPE geometry(POINT, 4326) "
+        "USING coordinates::geometry"
+    )
+    op.execute("CREATE INDEX idx_auctions_coordinates ON auctions USING GIST (coordinates)")
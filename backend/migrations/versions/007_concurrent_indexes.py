@@ -0,0 +1,47 @@
+"""Ensure the base table indexes exist and drop redundant id indexes.
+
+The base indexes belong to 001; they are only built here (CONCURRENTLY,
+without blocking writes) on databases where they are missing. The
+duplicates of the primary keys are dropped. Downgrading only restores the
+id indexes, never the indexes owned by 001.
+"""
+from alembic import op
+
+# revision identifiers
+revision = '007_concurrent_indexes'
+down_revision = '006_coordinates_geography'
+branch_labels = None
+depends_on = None
+
+# (name, CREATE ... definition); owned by 001, created here only if missing
+INDEXES = [
+    ('ix_users_email', 'UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email ON users (email)'),
+    ('ix_auctions_external_id', 'UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_external_id ON auctions (external_id)'),
+    ('ix_auctions_status', 'INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_status ON auctions (status)'),
+    ('ix_auctions_auction_date', 'INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_auction_date ON auctions (auction_date)'),
+]
+
+# Plain btree indexes on primary key columns, duplicating the pkey index
+REDUNDANT_ID_INDEXES = [
+    ('ix_users_id', 'users'),
+    ('ix_auctions_id', 'auctions'),
+    ('ix_search_preferences_id', 'search_preferences'),
+    ('ix_notifications_id', 'notifications'),
+    ('ix_scraping_logs_id', 'scraping_logs'),
+]
+
+
+def upgrade():
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for _, definition in INDEXES:
+            op.execute(f"CREATE {definition}")
+
+        for name, _ in REDUNDANT_ID_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_ID_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} (id)")
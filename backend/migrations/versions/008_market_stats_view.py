@@ -0,0 +1,43 @@
+"""Materialized view with pre-aggregated market statistics."""
+from alembic import op
+
+# revision identifiers
+revision = '008_market_stats_view'
+down_revision = '007_concurrent_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per (city, property type, price bucket); buckets match
+    # PRICE_RANGES in src/api/auctions.py. Sums and counts (not averages)
+    # so filtered totals can be re-aggregated exactly.
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_market_stats AS
+        SELECT
+            coalesce(city, '') AS city,
+            property_type,
+            CASE
+                WHEN base_price < 50000 THEN '0-50k'
+                WHEN base_price < 100000 THEN '50k-100k'
+                WHEN base_price < 250000 THEN '100k-250k'
+                WHEN base_price < 500000 THEN '250k-500k'
+                ELSE '500k+'
+            END AS price_range,
+            count(*) AS n,
+            sum(base_price) AS sum_price,
+            count(ai_score) AS n_scored,
+            sum(ai_score) AS sum_score
+        FROM auctions
+        WHERE status = 'ACTIVE'
+        GROUP BY 1, 2, 3
+    """)
+    # Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_market_stats_key "
+        "ON mv_market_stats (city, property_type, price_range)"
+    )
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_market_stats")
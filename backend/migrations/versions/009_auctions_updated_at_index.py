@@ -0,0 +1,22 @@
+"""Index auctions.updated_at for the listing ETag version lookup."""
+from alembic import op
+
+# revision identifiers
+revision = '009_auctions_updated_at_index'
+down_revision = '008_market_stats_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auctions_updated_at "
+            "ON auctions (updated_at)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_auctions_updated_at")
@@ -0,0 +1,57 @@
+"""Per-user indexes on search_preferences."""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010_preference_indexes'
+down_revision = '009_auctions_updated_at_index'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    # Keep the newest active preference per (user, name) as is so the unique
+    # index can be built; older duplicates stay active but get their id
+    # appended to the name (within the 200-character limit), and each
+    # rename is logged
+    renamed = op.get_bind().execute(sa.text("""
+        UPDATE search_preferences p
+        SET name = left(p.name, 200 - length(' (' || p.id || ')')) || ' (' || p.id || ')'
+        FROM search_preferences old
+        WHERE old.id = p.id
+          AND p.is_active
+          AND EXISTS (
+              SELECT 1 FROM search_preferences newer
+              WHERE newer.user_id = p.user_id
+                AND newer.name = p.name
+                AND newer.is_active
+                AND newer.id > p.id
+          )
+        RETURNING p.id, p.user_id, old.name, p.name
+    """)).fetchall()
+    for preference_id, user_id, old_name, new_name in renamed:
+        logger.warning(
+            "Renamed duplicate active preference %s of user %s: %r -> %r",
+            preference_id, user_id, old_name, new_name
+        )
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pref_user_created "
+            "ON search_preferences (user_id, created_at DESC)"
+        )
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_pref_user_name "
+            "ON search_preferences (user_id, name) WHERE is_active"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pref_user_name")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pref_user_created")
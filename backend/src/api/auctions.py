@@ -2,19 +2,29 @@
 Auction API endpoints.
 CRUD operations and search functionality for auctions.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from geoalchemy2.functions import ST_Distance, ST_GeogFromText, ST_AsText
+from sqlalchemy import select, func, tuple_, lambda_stmt, text
+from sqlalchemy.exc import DataError, IntegrityError
+from asyncpg.exceptions import DataError as PgDataError, IntegrityConstraintViolationError
+from typing import Callable, List, Optional, Tuple
+from geoalchemy2.functions import ST_DWithin, ST_GeogFromText, ST_AsText
+from collections import defaultdict
+import base64
+import hashlib
+import json
 import structlog
 
+from ..bulk import bulk_upsert_auctions
+from ..cache import cache_get, cache_set
+from ..config import settings
 from ..database import get_db
+from ..market_stats import market_stats_view, MARKET_STATS_VERSION_KEY
 from ..models import Auction, PropertyType, AuctionStatus
 from ..schemas import (
     AuctionResponse,
     AuctionListResponse,
+    AuctionListAdapter,
     AuctionFilters,
     SearchQuery,
     SearchResponse,
@@ -27,11 +37,294 @@ logger = structlog.get_logger()
 
 router = APIRouter()
 
+# Above this many (estimated) rows, listings report the planner estimate
+# instead of counting the filtered set exactly; counts without an estimate
+# stop at this many rows and report a lower bound
+EXACT_COUNT_THRESHOLD = 10000
+
+# Market stats price buckets: (name, min inclusive, max exclusive or None).
+# Must match the CASE expression of mv_market_stats (migration 008).
+PRICE_RANGES = [
+    ("0-50k", 0, 50000),
+    ("50k-100k", 50000, 100000),
+    ("100k-250k", 100000, 250000),
+    ("250k-500k", 250000, 500000),
+    ("500k+", 500000, None),
+]
+
+
+# A criterion is a `lambda s: s.where(...)` step for lambda_stmt(). Statements
+# built from lambdas cache both the construct and its compiled SQL per call
+# site; plain values referenced by the lambdas become bound parameters.
+Criterion = Callable
+
+
+def _apply(stmt, criteria: List[Criterion]):
+    """Append lambda criteria to a lambda statement."""
+    for criterion in criteria:
+        stmt += criterion
+    return stmt
+
+
+async def _auction_set_version(db: AsyncSession) -> str:
+    """
+    Version of the auctions table for ETags.
+    
+    Every insert or update bumps updated_at, so the latest value changes
+    whenever any listing could change. Reading it is a single probe of
+    ix_auctions_updated_at rather than a scan of the filtered set.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Version string
+    """
+    last_updated = await db.scalar(lambda_stmt(lambda: select(func.max(Auction.updated_at))))
+    return str(last_updated)
+
+
+def _set_cache_headers(request: Request, response: Response, version: str) -> str:
+    """
+    Compute an ETag for the request and apply HTTP cache headers.
+    
+    The ETag hashes the data version with the request's path and query string.
+    
+    Args:
+        request: Incoming request
+        response: Outgoing response to attach headers to
+        version: Version of the data the response is built from
+    
+    Returns:
+        ETag value
+    
+    Raises:
+        HTTPException: 304 if the client's If-None-Match matches
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{request.url.path}?{request.url.query}|{version}".encode())
+    etag = f'"{digest.hexdigest()}"'
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return etag
+
+
+def _encode_cursor(auction: Auction, page: int, total: int) -> str:
+    """Encode the keyset position after `auction` as an opaque cursor."""
+    raw = json.dumps([auction.ai_score, auction.id, page, total], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[float], int, int, int]:
+    """
+    Decode a cursor produced by `_encode_cursor`.
+    
+    Returns:
+        Tuple of (last_score, last_id, page, total)
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_score, last_id, page, total = json.loads(base64.urlsafe_b64decode(padded))
+        if int(page) < 2:
+            raise ValueError("cursor page out of range")
+        return (
+            float(last_score) if last_score is not None else None,
+            int(last_id),
+            int(page),
+            int(total)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _order_by_score(s):
+    """Default listing order; must match the keyset predicate and indexes."""
+    return s.order_by(Auction.ai_score.desc().nullslast(), Auction.id.desc())
+
+
+async def _estimated_active_count(db: AsyncSession) -> Optional[int]:
+    """
+    Estimated number of ACTIVE auctions, or None if not yet analyzed.
+    
+    Read from the statistics of the partial ix_auctions_active_score index,
+    which has exactly one entry per ACTIVE auction.
+    """
+    estimate = await db.scalar(text(
+        "SELECT reltuples::bigint FROM pg_class WHERE relname = 'ix_auctions_active_score'"
+    ))
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+async def _fetch_after(
+    db: AsyncSession,
+    criteria: List[Criterion],
+    last_score: Optional[float],
+    last_id: int,
+    page_size: int
+) -> Tuple[List[Auction], bool]:
+    """
+    Fetch the page after (last_score, last_id) in `ai_score DESC NULLS LAST,
+    id DESC` order, without counting.
+    
+    Scored rows are read with a seek on (ai_score, id). The NULL-score tail,
+    ordered by id only, is a separate seek run only once the scored rows
+    run out, so each query is a plain index range scan.
+    
+    Returns:
+        (auctions, has_more)
+    """
+    # One extra row tells whether another page exists
+    limit = page_size + 1
+    auctions = []
+    
+    if last_score is not None:
+        query = _apply(lambda_stmt(lambda: select(Auction)), criteria)
+        query += lambda s: s.where(tuple_(Auction.ai_score, Auction.id) < tuple_(last_score, last_id))
+        query += _order_by_score
+        query += lambda s: s.limit(limit)
+        auctions = list((await db.execute(query)).scalars().all())
+    
+    if len(auctions) < limit:
+        remaining = limit - len(auctions)
+        query = _apply(lambda_stmt(lambda: select(Auction)), criteria)
+        if last_score is None:
+            query += lambda s: s.where(Auction.ai_score.is_(None), Auction.id < last_id)
+        else:
+            query += lambda s: s.where(Auction.ai_score.is_(None))
+        query += lambda s: s.order_by(Auction.id.desc()).limit(remaining)
+        auctions += (await db.execute(query)).scalars().all()
+    
+    return auctions[:page_size], len(auctions) > page_size
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    criteria: List[Criterion],
+    page: int,
+    page_size: int,
+    order_by: Criterion = _order_by_score,
+    estimated_total: Optional[int] = None,
+    max_total: Optional[int] = None
+) -> Tuple[List[Auction], int, bool]:
+    """
+    Fetch one page of auctions together with the total match count.
+    
+    If `estimated_total` exceeds EXACT_COUNT_THRESHOLD it is reported as the
+    total and the page is read with a plain LIMIT. If it is below, or if
+    `max_total` (an estimated upper bound, such as the size of a superset)
+    is, the total comes from a COUNT(*) OVER () window on the page query.
+    Otherwise the page is read with a plain LIMIT and the matches are
+    counted by a second query that stops after EXACT_COUNT_THRESHOLD + 1
+    rows; past that the total is a lower bound.
+    
+    Pages are addressed by OFFSET; cursor pages go through `_fetch_after`.
+    
+    Returns:
+        (auctions, total, has_more)
+    """
+    def page_query(with_total: bool):
+        if with_total:
+            query = lambda_stmt(lambda: select(Auction, func.count().over().label("total")))
+        else:
+            query = lambda_stmt(lambda: select(Auction))
+        query = _apply(query, criteria)
+        query += order_by
+        offset = (page - 1) * page_size
+        query += lambda s: s.offset(offset)
+        # One extra row tells whether another page exists
+        limit = page_size + 1
+        query += lambda s: s.limit(limit)
+        return query
+    
+    skipped = (page - 1) * page_size
+    bound = estimated_total if estimated_total is not None else max_total
+    
+    if estimated_total is not None and estimated_total > EXACT_COUNT_THRESHOLD:
+        result = await db.execute(page_query(with_total=False))
+        auctions = result.scalars().all()
+        return auctions[:page_size], estimated_total, len(auctions) > page_size
+    
+    if bound is None or bound > EXACT_COUNT_THRESHOLD:
+        result = await db.execute(page_query(with_total=False))
+        auctions = result.scalars().all()
+        has_more = len(auctions) > page_size
+        auctions = auctions[:page_size]
+        
+        # Criteria are plain .where() steps, so they also build a regular subquery
+        matches = select(Auction.id)
+        for criterion in criteria:
+            matches = criterion(matches)
+        capped = matches.limit(EXACT_COUNT_THRESHOLD + 1).subquery()
+        counted = await db.scalar(select(func.count()).select_from(capped))
+        return auctions, max(counted, skipped + len(auctions) + int(has_more)), has_more
+    
+    result = await db.execute(page_query(with_total=True))
+    rows = result.all()
+    
+    if rows:
+        return [row[0] for row in rows[:page_size]], rows[0].total, len(rows) > page_size
+    
+    if page == 1:
+        return [], 0, False
+    
+    # Past the last page the window has no rows to report on
+    count_query = _apply(
+        lambda_stmt(lambda: select(func.count()).select_from(Auction)),
+        criteria
+    )
+    total_result = await db.execute(count_query)
+    return [], total_result.scalar(), False
+
+
+def _list_response(response: Response, auctions: List[Auction], **fields) -> Response:
+    """
+    Serialize an auction listing directly to a JSON response.
+    
+    The page is validated from ORM rows in one TypeAdapter pass and dumped by
+    pydantic-core, instead of FastAPI validating the returned model a second
+    time and encoding it separately. Headers already set on the dependency
+    response (ETag, Cache-Control) are carried over.
+    
+    Args:
+        response: Response injected into the endpoint
+        auctions: Auctions on the page
+        **fields: Remaining AuctionListResponse fields
+    
+    Returns:
+        JSON response with an AuctionListResponse body
+    """
+    payload = AuctionListResponse.model_construct(
+        items=AuctionListAdapter.validate_python(auctions),
+        **fields
+    )
+    return Response(
+        content=payload.model_dump_json(),
+        media_type="application/json",
+        headers=dict(response.headers)
+    )
+
 
 @router.get("/auctions", response_model=AuctionListResponse)
 async def list_auctions(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     city: Optional[str] = None,
     property_type: Optional[PropertyType] = None,
     min_price: Optional[float] = None,
@@ -43,9 +336,12 @@ async def list_auctions(
     """
     Get paginated list of auctions with filters.
     
+    Responses carry an ETag and honor If-None-Match with 304 Not Modified.
+    
     Query Parameters:
-    - page: Page number (default: 1)
+    - page: Page number (default: 1), ignored when cursor is given
     - page_size: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from a previous response's next_cursor
     - city: Filter by city name
     - property_type: Filter by property type
     - min_price: Minimum base price
@@ -53,46 +349,53 @@ async def list_auctions(
     - min_score: Minimum AI score (0-100)
     - status: Auction status (default: active)
     """
-    # Build query
-    query = select(Auction)
-    
-    # Apply filters
-    filters = []
+    # Apply filters; each present filter adds a fixed-shape lambda step, so
+    # every filter combination compiles once and is then served from cache
+    criteria = []
     if status:
-        filters.append(Auction.status == status)
+        criteria.append(lambda s: s.where(Auction.status == status))
     if city:
-        filters.append(Auction.city.ilike(f"%{city}%"))
+        city_pattern = f"%{city}%"
+        criteria.append(lambda s: s.where(Auction.city.ilike(city_pattern)))
     if property_type:
-        filters.append(Auction.property_type == property_type)
+        criteria.append(lambda s: s.where(Auction.property_type == property_type))
     if min_price:
-        filters.append(Auction.base_price >= min_price)
+        criteria.append(lambda s: s.where(Auction.base_price >= min_price))
     if max_price:
-        filters.append(Auction.base_price <= max_price)
+        criteria.append(lambda s: s.where(Auction.base_price <= max_price))
     if min_score:
-        filters.append(Auction.ai_score >= min_score)
-    
-    if filters:
-        query = query.where(and_(*filters))
-    
-    # Count total
-    count_query = select(func.count()).select_from(Auction)
-    if filters:
-        count_query = count_query.where(and_(*filters))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Auction.ai_score.desc().nullslast())
-    
-    # Execute query
-    result = await db.execute(query)
-    auctions = result.scalars().all()
+        criteria.append(lambda s: s.where(Auction.ai_score >= min_score))
+    
+    _set_cache_headers(request, response, await _auction_set_version(db))
+    
+    if cursor:
+        # Cursor pages carry the total counted on the first page
+        last_score, last_id, page, total = _decode_cursor(cursor)
+        auctions, has_more = await _fetch_after(db, criteria, last_score, last_id, page_size)
+    else:
+        # The default listing is too large to count exactly on every request;
+        # filtered ACTIVE listings are a subset of it, so it bounds them too
+        estimated_total = None
+        max_total = None
+        if status == AuctionStatus.ACTIVE:
+            active_estimate = await _estimated_active_count(db)
+            unfiltered = not (city or property_type or min_price or max_price or min_score)
+            if unfiltered:
+                estimated_total = active_estimate
+            else:
+                max_total = active_estimate
+        
+        auctions, total, has_more = await _fetch_page(
+            db, criteria, page, page_size, estimated_total=estimated_total, max_total=max_total
+        )
     
     # Calculate pages
     pages = (total + page_size - 1) // page_size
     
+    next_cursor = None
+    if has_more:
+        next_cursor = _encode_cursor(auctions[-1], page + 1, total)
+    
     logger.info(
         "list_auctions",
         total=total,
@@ -104,12 +407,14 @@ async def list_auctions(
         }
     )
     
-    return AuctionListResponse(
-        items=auctions,
+    return _list_response(
+        response,
+        auctions,
         total=total,
         page=page,
         page_size=page_size,
-        pages=pages
+        pages=pages,
+        next_cursor=next_cursor
     )
 
 
@@ -141,57 +446,47 @@ async def get_auction(
 
 @router.get("/auctions/search/text", response_model=AuctionListResponse)
 async def search_auctions_text(
+    response: Response,
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search auctions by text query (title, description, address).
+    Search auctions by text query (title, city, address, description).
+    
+    Uses Italian full-text search, so terms are stemmed and the query
+    accepts web-search syntax ("quoted phrases", -excluded, OR).
     
     Query Parameters:
     - q: Search query
     - page: Page number
     - page_size: Items per page
     """
-    # Simple text search across multiple fields
-    search_filter = or_(
-        Auction.title.ilike(f"%{q}%"),
-        Auction.description.ilike(f"%{q}%"),
-        Auction.address.ilike(f"%{q}%"),
-        Auction.city.ilike(f"%{q}%")
-    )
-    
-    query = select(Auction).where(
-        and_(
+    # Full-text search on the generated tsvector column (GIN indexed)
+    criteria = [
+        lambda s: s.where(
             Auction.status == AuctionStatus.ACTIVE,
-            search_filter
+            Auction.tsv.op("@@")(func.websearch_to_tsquery("italian", q))
         )
-    )
+    ]
     
-    # Count total
-    count_query = select(func.count()).select_from(Auction).where(
-        and_(
-            Auction.status == AuctionStatus.ACTIVE,
-            search_filter
+    def order_by(s):
+        return s.order_by(
+            func.ts_rank_cd(Auction.tsv, func.websearch_to_tsquery("italian", q)).desc(),
+            Auction.ai_score.desc().nullslast(),
+            Auction.id.desc()
         )
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Auction.ai_score.desc().nullslast())
     
-    result = await db.execute(query)
-    auctions = result.scalars().all()
+    auctions, total, _ = await _fetch_page(db, criteria, page, page_size, order_by=order_by)
     
     pages = (total + page_size - 1) // page_size
     
     logger.info("search_auctions_text", query=q, total=total)
     
-    return AuctionListResponse(
-        items=auctions,
+    return _list_response(
+        response,
+        auctions,
         total=total,
         page=page,
         page_size=page_size,
@@ -216,36 +511,36 @@ async def get_nearby_auctions(
     - radius_km: Search radius in kilometers (default: 10km)
     - limit: Maximum number of results (default: 10)
     """
-    # Get reference auction
-    ref_query = select(Auction).where(Auction.id == auction_id)
-    ref_result = await db.execute(ref_query)
-    ref_auction = ref_result.scalar_one_or_none()
-    
-    if not ref_auction or not ref_auction.coordinates:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Auction not found or has no coordinates"
-        )
-    
-    # Query nearby auctions using PostGIS
-    # ST_Distance returns distance in meters
-    distance_expr = ST_Distance(
-        Auction.coordinates,
-        ref_auction.coordinates
-    )
+    # Reference point resolved inside the same statement
+    ref_coordinates = select(Auction.coordinates).where(
+        Auction.id == auction_id
+    ).scalar_subquery()
     
+    # coordinates is a geography column: ST_DWithin works in meters and both
+    # it and the <-> KNN ordering use the GIST index directly
     query = select(Auction).where(
-        and_(
-            Auction.id != auction_id,
-            Auction.status == AuctionStatus.ACTIVE,
-            Auction.coordinates.isnot(None),
-            distance_expr <= radius_km * 1000
-        )
-    ).order_by(distance_expr).limit(limit)
+        Auction.id != auction_id,
+        Auction.status == AuctionStatus.ACTIVE,
+        ST_DWithin(Auction.coordinates, ref_coordinates, radius_km * 1000)
+    ).order_by(Auction.coordinates.op("<->")(ref_coordinates)).limit(limit)
     
     result = await db.execute(query)
     nearby = result.scalars().all()
     
+    if not nearby:
+        # Only an empty result needs to tell "nothing nearby" from a bad reference
+        ref_exists = await db.execute(
+            select(Auction.id).where(
+                Auction.id == auction_id,
+                Auction.coordinates.isnot(None)
+            )
+        )
+        if ref_exists.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Auction not found or has no coordinates"
+            )
+    
     logger.info(
         "get_nearby_auctions",
         auction_id=auction_id,
@@ -258,74 +553,101 @@ async def get_nearby_auctions(
 
 @router.get("/stats/market", response_model=MarketStats)
 async def get_market_stats(
+    request: Request,
+    response: Response,
     city: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get market statistics and aggregations.
     
+    Figures come from the mv_market_stats materialized view, so they can lag
+    behind new auctions by up to MARKET_STATS_REFRESH_MINUTES. Responses carry
+    an ETag tied to the view's last refresh and honor If-None-Match with
+    304 Not Modified.
+    
     Query Parameters:
     - city: Filter by city (optional)
     """
-    filters = [Auction.status == AuctionStatus.ACTIVE]
+    cache_key = None
+    version = await cache_get(MARKET_STATS_VERSION_KEY)
+    if version is not None:
+        _set_cache_headers(request, response, version)
+        cache_key = f"market_stats:{version}:{(city or '').lower()}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return MarketStats(**cached)
+    
+    # A few hundred pre-aggregated (city, type, price bucket) rows
+    query = select(market_stats_view)
     if city:
-        filters.append(Auction.city.ilike(f"%{city}%"))
-    
-    # Total and active auctions
-    total_query = select(func.count()).select_from(Auction).where(and_(*filters))
-    total_result = await db.execute(total_query)
-    total_auctions = total_result.scalar()
-    
-    # Average price and score
-    avg_query = select(
-        func.avg(Auction.base_price),
-        func.avg(Auction.ai_score)
-    ).where(and_(*filters))
-    avg_result = await db.execute(avg_query)
-    avg_price, avg_score = avg_result.one()
-    
-    # Property type distribution
-    type_query = select(
-        Auction.property_type,
-        func.count()
-    ).where(and_(*filters)).group_by(Auction.property_type)
-    type_result = await db.execute(type_query)
-    property_dist = {str(pt): count for pt, count in type_result.all()}
+        query = query.where(market_stats_view.c.city.ilike(f"%{city}%"))
+    result = await db.execute(query)
+    
+    total_auctions = 0
+    sum_price = 0.0
+    n_scored = 0
+    sum_score = 0.0
+    property_dist = defaultdict(int)
+    city_counts = defaultdict(int)
+    price_ranges = {range_name: 0 for range_name, _, _ in PRICE_RANGES}
+    for row in result.all():
+        total_auctions += row.n
+        sum_price += row.sum_price or 0.0
+        n_scored += row.n_scored
+        sum_score += row.sum_score or 0.0
+        property_dist[str(row.property_type)] += row.n
+        if row.city:
+            city_counts[row.city] += row.n
+        price_ranges[row.price_range] += row.n
     
     # City distribution (top 10)
-    city_query = select(
-        Auction.city,
-        func.count()
-    ).where(and_(*filters)).group_by(Auction.city).order_by(func.count().desc()).limit(10)
-    city_result = await db.execute(city_query)
-    city_dist = {city: count for city, count in city_result.all() if city}
-    
-    # Price ranges
-    price_ranges = {}
-    for range_name, min_p, max_p in [
-        ("0-50k", 0, 50000),
-        ("50k-100k", 50000, 100000),
-        ("100k-250k", 100000, 250000),
-        ("250k-500k", 250000, 500000),
-        ("500k+", 500000, float('inf'))
-    ]:
-        range_filters = filters + [
-            Auction.base_price >= min_p,
-            Auction.base_price < max_p if max_p != float('inf') else Auction.base_price >= min_p
-        ]
-        range_query = select(func.count()).select_from(Auction).where(and_(*range_filters))
-        range_result = await db.execute(range_query)
-        price_ranges[range_name] = range_result.scalar()
-    
-    return MarketStats(
+    city_dist = dict(sorted(city_counts.items(), key=lambda item: item[1], reverse=True)[:10])
+    
+    stats = MarketStats(
         total_auctions=total_auctions,
         active_auctions=total_auctions,
-        avg_base_price=float(avg_price) if avg_price else 0.0,
-        avg_score=float(avg_score) if avg_score else 0.0,
-        property_type_distribution=property_dist,
+        avg_base_price=sum_price / total_auctions if total_auctions else 0.0,
+        avg_score=sum_score / n_scored if n_scored else 0.0,
+        property_type_distribution=dict(property_dist),
         city_distribution=city_dist,
         price_ranges=price_ranges
     )
+    
+    if cache_key:
+        await cache_set(cache_key, stats.model_dump(), settings.MARKET_STATS_CACHE_TTL)
+    
+    return stats
+
+
+@router.post("/auctions/scraper/bulk")
+async def bulk_create_auctions_from_scraper(
+    auctions_data: List[dict],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create or update a batch of auctions from scraper/NLP service.
+    Same payload as POST /auctions/scraper, merged in a single transaction.
+    
+    Rows the database rejects (bad values, constraint violations) fail the
+    batch with 422, so callers can tell a bad row from a backend failure.
+    """
+    try:
+        upserted = await bulk_upsert_auctions(db, auctions_data)
+        await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except (DataError, IntegrityError, PgDataError, IntegrityConstraintViolationError) as e:
+        # COPY runs on the raw asyncpg connection, so its errors are not wrapped
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=f"Invalid auction data: {str(e)}")
+    except Exception as e:
+        await db.rollback()
+        logger.error("bulk_create_auctions_failed", error=str(e), count=len(auctions_data))
+        raise HTTPException(status_code=500, detail=f"Failed to save auctions: {str(e)}")
+    
+    return {"upserted": upserted}
 
 
 @router.post("/auctions/scraper", response_model=AuctionResponse, status_code=status.HTTP_201_CREATED)
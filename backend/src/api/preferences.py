@@ -2,18 +2,22 @@
 Search preferences API endpoints.
 Manage user saved searches and notification preferences.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, and_, or_, case, cast, func, literal, Float, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 import structlog
 
 from ..database import get_db
-from ..models import User, SearchPreference
+from ..models import User, SearchPreference, Auction, AuctionStatus, PropertyType
 from ..schemas import (
     SearchPreferenceCreate,
     SearchPreferenceUpdate,
-    SearchPreferenceResponse
+    SearchPreferenceResponse,
+    PreferenceMatch
 )
 from ..auth import get_current_user
 
@@ -22,6 +26,111 @@ logger = structlog.get_logger()
 router = APIRouter()
 
 
+def _filter_contains(filters_key: str, value):
+    """
+    Predicate: filters @> {filters_key: value}.
+    
+    Top-level containment is the form ix_pref_filters_gin (jsonb_path_ops)
+    can serve; sub-path tests like filters->'key' @> ... cannot use it.
+    """
+    return SearchPreference.filters.contains(
+        func.jsonb_build_object(cast(literal(filters_key), String), value)
+    )
+
+
+def _filter_matches(auction_column, filters_key: str, operator: str):
+    """Predicate: filter key absent (or not a number), or auction_column compares true against it."""
+    value = SearchPreference.filters[filters_key]
+    # Only cast JSON numbers, so a malformed stored filter cannot abort the query
+    numeric = case((func.jsonb_typeof(value) == "number", cast(value.astext, Float)))
+    comparison = auction_column >= numeric if operator == ">=" else auction_column <= numeric
+    return or_(numeric.is_(None), comparison)
+
+
+def _preference_match_conditions():
+    """
+    Join conditions between SearchPreference.filters (AuctionFilters keys)
+    and Auction, evaluated in SQL so all preferences are matched at once.
+    """
+    filters = SearchPreference.filters
+    # Filters may name property types by enum name or by label
+    type_name = cast(Auction.property_type, String)
+    type_label = cast(case(
+        {pt.name: pt.value for pt in PropertyType},
+        value=type_name
+    ), String)
+    return [
+        or_(
+            filters["city"].astext.is_(None),
+            Auction.city.ilike(func.concat("%", filters["city"].astext, "%"))
+        ),
+        # A JSON array contains a one-element array of any of its elements
+        or_(
+            filters["cities"].astext.is_(None),
+            _filter_contains("cities", func.jsonb_build_array(Auction.city))
+        ),
+        or_(
+            filters["property_type"].astext.is_(None),
+            _filter_contains("property_type", type_name),
+            _filter_contains("property_type", type_label)
+        ),
+        or_(
+            filters["property_types"].astext.is_(None),
+            _filter_contains("property_types", func.jsonb_build_array(type_name)),
+            _filter_contains("property_types", func.jsonb_build_array(type_label))
+        ),
+        _filter_matches(Auction.base_price, "min_price", ">="),
+        _filter_matches(Auction.base_price, "max_price", "<="),
+        _filter_matches(Auction.surface_sqm, "min_surface", ">="),
+        _filter_matches(Auction.surface_sqm, "max_surface", "<="),
+        _filter_matches(Auction.ai_score, "min_score", ">="),
+    ]
+
+
+async def find_preference_matches(
+    db: AsyncSession,
+    since: datetime,
+    user_id: Optional[int] = None,
+    notify_only: bool = False
+) -> List[Tuple[int, int, int]]:
+    """
+    Match active search preferences against recently created auctions.
+    
+    Runs a single JOIN between search_preferences and auctions instead of
+    one auction query per preference.
+    
+    Args:
+        db: Database session
+        since: Only consider auctions created after this time (UTC)
+        user_id: Restrict to one user's preferences
+        notify_only: Only preferences with notifications enabled
+    
+    Returns:
+        List of (preference_id, user_id, auction_id) tuples
+    """
+    conditions = [SearchPreference.is_active.is_(True)]
+    if user_id is not None:
+        conditions.append(SearchPreference.user_id == user_id)
+    if notify_only:
+        conditions.append(SearchPreference.notify.is_(True))
+    
+    query = select(
+        SearchPreference.id,
+        SearchPreference.user_id,
+        Auction.id
+    ).join(
+        Auction,
+        and_(
+            Auction.status == AuctionStatus.ACTIVE,
+            Auction.created_at > since,
+            *_preference_match_conditions()
+        )
+    ).where(and_(*conditions)).order_by(SearchPreference.id, Auction.id)
+    
+    result = await db.execute(query)
+    return [tuple(row) for row in result.all()]
+
+
 @router.get("/preferences", response_model=List[SearchPreferenceResponse])
 async def list_preferences(
     current_user: User = Depends(get_current_user),
@@ -58,17 +167,32 @@ async def create_preference(
     
     Requires authentication.
     """
-    new_preference = SearchPreference(
-        user_id=current_user.id,
-        name=preference_data.name,
-        filters=preference_data.filters,
-        notify=preference_data.notify,
-        is_active=True
+    # Active names are unique per user (ix_pref_user_name)
+    stmt = (
+        pg_insert(SearchPreference)
+        .values(
+            user_id=current_user.id,
+            name=preference_data.name,
+            filters=preference_data.filters,
+            notify=preference_data.notify,
+            is_active=True
+        )
+        .on_conflict_do_nothing(
+            index_elements=[SearchPreference.user_id, SearchPreference.name],
+            index_where=SearchPreference.is_active
+        )
+        .returning(SearchPreference)
     )
+    result = await db.execute(select(SearchPreference).from_statement(stmt))
+    new_preference = result.scalar_one_or_none()
+    
+    if new_preference is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Preference name already in use"
+        )
     
-    db.add(new_preference)
     await db.commit()
-    await db.refresh(new_preference)
     
     logger.info(
         "preference_created",
@@ -80,6 +204,35 @@ async def create_preference(
     return new_preference
 
 
+@router.get("/preferences/matches", response_model=List[PreferenceMatch])
+async def list_preference_matches(
+    since_hours: int = Query(24, ge=1, le=720),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get recent auctions matching the current user's active preferences.
+    
+    Query Parameters:
+    - since_hours: Only auctions created in the last N hours (default: 24)
+    
+    Requires authentication.
+    """
+    since = datetime.utcnow() - timedelta(hours=since_hours)
+    matches = await find_preference_matches(db, since, user_id=current_user.id)
+    
+    logger.info(
+        "preference_matches_listed",
+        user_id=current_user.id,
+        matches=len(matches)
+    )
+    
+    return [
+        PreferenceMatch(preference_id=preference_id, auction_id=auction_id)
+        for preference_id, _, auction_id in matches
+    ]
+
+
 @router.get("/preferences/{preference_id}", response_model=SearchPreferenceResponse)
 async def get_preference(
     preference_id: int,
@@ -154,7 +307,15 @@ async def update_preference(
     if preference_data.is_active is not None:
         preference.is_active = preference_data.is_active
     
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Renamed or reactivated onto another active preference's name
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Preference name already in use"
+        )
     await db.refresh(preference)
     
     logger.info(
@@ -5,6 +5,8 @@ Registration, login, and profile management.
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 import structlog
 
@@ -36,30 +38,30 @@ async def register_user(
     - email: User email (unique)
     - password: Password (min 8 characters)
     """
-    # Check if user already exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
+    # Single round-trip insert; the unique email index resolves concurrent
+    # registrations instead of a separate existence check
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
+    stmt = (
+        pg_insert(User)
+        .values(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            is_active=True,
+            is_admin=False
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    existing_user = result.scalar_one_or_none()
+    result = await db.execute(select(User).from_statement(stmt))
+    new_user = result.scalar_one_or_none()
     
-    if existing_user:
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    new_user = User(
-        email=user_data.email,
-        hashed_password=hashed_password,
-        is_active=True,
-        is_admin=False
-    )
-    
-    db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     logger.info("user_registered", user_id=new_user.id, email=new_user.email)
     
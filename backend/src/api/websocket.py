@@ -3,18 +3,103 @@ WebSocket handler for real-time notifications.
 Manages WebSocket connections and broadcasts notifications to connected clients.
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from typing import Dict, List
+from dataclasses import dataclass
 import structlog
-import json
-from jose import jwt, JWTError
+import asyncio
+import orjson
+import base64
+import hashlib
+import hmac
+import time
+import zlib
+from cachetools import TTLCache
+from jose import jwt, JWTError, ExpiredSignatureError
 
 from ..config import settings
 from ..models import User
 
 logger = structlog.get_logger()
 
-# Active WebSocket connections: user_id -> set of WebSocket connections
-active_connections: Dict[int, Set[WebSocket]] = {}
+
+@dataclass(slots=True)
+class WSConn:
+    """A registered connection and its queue of JSON-encoded messages."""
+    ws: WebSocket
+    user_id: int
+    queue: asyncio.Queue
+    alive: bool = True
+
+
+# Connection registry: connection id (id(ws)) -> connection
+_conns: Dict[int, WSConn] = {}
+# Index of connection ids per user
+_by_user: Dict[int, List[int]] = {}
+
+# Per-connection outbound queue bound; the oldest message is dropped when full
+SEND_QUEUE_SIZE = 1000
+# Maximum number of queued messages coalesced into one frame
+MAX_BATCH_SIZE = 128
+
+# Encoded messages at least this large are deflated once per broadcast and
+# sent as binary frames (permessage-deflate is disabled server-side)
+COMPRESS_MIN_SIZE = 1024
+
+PONG = orjson.dumps({"type": "pong"})
+
+
+class DeflatedPayload(bytes):
+    """A zlib-compressed JSON message, sent on its own as a binary frame."""
+
+# Verified tokens: sha256(token)[:16] -> (user_id, exp); raw tokens are never stored
+TOKEN_CACHE_TTL = 60  # seconds
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """Decode a base64url JWT segment (padding stripped)."""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict:
+    """
+    Verify an HS256 JWT with hmac/hashlib directly and return its claims.
+    
+    Equivalent to jwt.decode for the tokens issued by auth.create_access_token,
+    without python-jose's per-call algorithm dispatch and key handling.
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Decoded payload
+    
+    Raises:
+        JWTError: If the token is malformed, signed differently, or expired
+    """
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        header = orjson.loads(_b64url_decode(header_segment))
+        if header.get("alg") != "HS256":
+            raise JWTError("The specified alg value is not allowed")
+        
+        expected = hmac.new(
+            settings.JWT_SECRET_KEY.encode(), signing_input.encode(), hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            raise JWTError("Signature verification failed.")
+        
+        payload = orjson.loads(_b64url_decode(payload_segment))
+        
+        now = time.time()
+        if "exp" in payload and now >= payload["exp"]:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in payload and now < payload["nbf"]:
+            raise JWTError("The token is not yet valid (nbf)")
+    except (ValueError, TypeError, AttributeError) as e:
+        raise JWTError(f"Invalid token: {e}")
+    return payload
 
 
 async def verify_token(token: str) -> int:
@@ -30,12 +115,24 @@ async def verify_token(token: str) -> int:
     Raises:
         ValueError: If token is invalid
     """
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, expires_at = cached
+        # Entries outlive neither the cache TTL nor the token itself
+        if expires_at is None or time.time() < expires_at:
+            return user_id
+        _token_cache.pop(key, None)
+    
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        if settings.JWT_ALGORITHM == "HS256":
+            payload = _decode_hs256(token)
+        else:
+            payload = jwt.decode(
+                token,
+                settings.JWT_SECRET_KEY,
+                algorithms=[settings.JWT_ALGORITHM]
+            )
         email: str = payload.get("sub")
         if email is None:
             raise ValueError("Invalid token payload")
@@ -44,6 +141,7 @@ async def verify_token(token: str) -> int:
         # For simplicity, we'll extract from token or use a mock value
         # This should be properly implemented with database lookup
         user_id = payload.get("user_id", 1)  # Mock implementation
+        _token_cache[key] = (user_id, payload.get("exp"))
         return user_id
     
     except JWTError as e:
@@ -51,6 +149,91 @@ async def verify_token(token: str) -> int:
         raise ValueError("Invalid token")
 
 
+def _register(conn: WSConn) -> None:
+    """Add a connection to the registry and the per-user index."""
+    conn_id = id(conn.ws)
+    _conns[conn_id] = conn
+    _by_user.setdefault(conn.user_id, []).append(conn_id)
+
+
+def _unregister(conn: WSConn) -> None:
+    """Remove a connection; safe to call more than once."""
+    if _conns.pop(id(conn.ws), None) is None:
+        return
+    conn.alive = False
+    conn_ids = _by_user[conn.user_id]
+    conn_ids.remove(id(conn.ws))
+    if not conn_ids:
+        del _by_user[conn.user_id]
+
+
+def _encode(message: dict) -> bytes:
+    """Serialize a broadcast message, deflating it once if it is large."""
+    payload = orjson.dumps(message)
+    if len(payload) >= COMPRESS_MIN_SIZE:
+        return DeflatedPayload(zlib.compress(payload))
+    return payload
+
+
+def _enqueue(queue: asyncio.Queue, payload: bytes) -> None:
+    """Queue a serialized message for a connection, dropping the oldest one when full."""
+    if queue.full():
+        queue.get_nowait()
+        logger.warning("websocket_queue_overflow")
+    queue.put_nowait(payload)
+
+
+def _broadcast_bytes(conn_ids: List[int], payload: bytes) -> None:
+    """Queue an already serialized message on each of the given connections."""
+    for conn_id in conn_ids:
+        _enqueue(_conns[conn_id].queue, payload)
+
+
+async def _send_text(websocket: WebSocket, items: List[bytes]) -> None:
+    """Send JSON-encoded messages as one text frame, batching several."""
+    if not items:
+        return
+    if len(items) == 1:
+        payload = items[0]
+    else:
+        payload = b'{"type":"batch","items":[' + b",".join(items) + b"]}"
+    await websocket.send_text(payload.decode())
+
+
+async def _write_messages(conn: WSConn):
+    """
+    Drain a connection's outbound queue.
+    
+    A message that is alone in the queue is sent as-is; messages that piled
+    up while the previous frame was being written are coalesced into a
+    single {"type": "batch", "items": [...]} frame. Queued messages are
+    already JSON-encoded, so batching only concatenates bytes. Deflated
+    payloads are never batched: they go out as binary frames, in order.
+    
+    Args:
+        conn: Registered connection
+    """
+    queue = conn.queue
+    while conn.alive:
+        batch = [await queue.get()]
+        while len(batch) < MAX_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        try:
+            pending = []
+            for item in batch:
+                if isinstance(item, DeflatedPayload):
+                    await _send_text(conn.ws, pending)
+                    pending = []
+                    await conn.ws.send_bytes(item)
+                else:
+                    pending.append(item)
+            await _send_text(conn.ws, pending)
+        except Exception as e:
+            logger.error("broadcast_failed", user_id=conn.user_id, error=str(e))
+            _unregister(conn)
+
+
 async def handle_websocket_connection(websocket: WebSocket, token: str = None):
     """
     Handle WebSocket connection lifecycle.
@@ -73,83 +256,66 @@ async def handle_websocket_connection(websocket: WebSocket, token: str = None):
     # Accept connection
     await websocket.accept()
     
-    # Register connection
-    if user_id not in active_connections:
-        active_connections[user_id] = set()
-    active_connections[user_id].add(websocket)
+    # Register connection; all writes go through its queue and writer task
+    conn = WSConn(websocket, user_id, asyncio.Queue(maxsize=SEND_QUEUE_SIZE))
+    _register(conn)
+    writer = asyncio.create_task(_write_messages(conn))
     
     logger.info(
         "websocket_connected",
         user_id=user_id,
-        total_connections=len(active_connections.get(user_id, set()))
+        total_connections=len(_by_user[user_id])
     )
     
     try:
-        # Keep connection alive and handle messages
+        # Liveness is checked with protocol-level ping frames sent by the
+        # server (uvicorn --ws-ping-interval); the loop only waits for client
+        # messages and the disconnect
         while True:
-            # Wait for messages from client (ping/pong, etc.)
             data = await websocket.receive_text()
             
-            # Echo back or handle client messages
-            message = json.loads(data)
-            if message.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+            # Legacy application-level ping; only small frames that mention
+            # "ping" are parsed at all
+            if len(data) <= 64 and '"ping"' in data:
+                message = orjson.loads(data)
+                if message.get("type") == "ping":
+                    _enqueue(conn.queue, PONG)
             
     except WebSocketDisconnect:
-        # Remove connection
-        if user_id in active_connections:
-            active_connections[user_id].discard(websocket)
-            if not active_connections[user_id]:
-                del active_connections[user_id]
-        
         logger.info("websocket_disconnected", user_id=user_id)
     
     except Exception as e:
         logger.error("websocket_error", user_id=user_id, error=str(e))
-        
+    
+    finally:
         # Clean up connection
-        if user_id in active_connections:
-            active_connections[user_id].discard(websocket)
-            if not active_connections[user_id]:
-                del active_connections[user_id]
+        writer.cancel()
+        _unregister(conn)
 
 
 async def broadcast_to_user(user_id: int, message: dict):
     """
     Broadcast a message to all connections for a specific user.
     
+    The message is serialized (and deflated, if large) once and queued per
+    connection; each connection's writer task sends it, so a slow client
+    never blocks the caller or other sockets.
+    
     Args:
         user_id: User ID to send message to
         message: Message dictionary to send
     """
-    if user_id not in active_connections:
+    conn_ids = _by_user.get(user_id)
+    if not conn_ids:
         logger.debug("no_active_connections", user_id=user_id)
         return
     
-    # Send to all user's connections
-    disconnected = set()
-    for websocket in active_connections[user_id]:
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(
-                "broadcast_failed",
-                user_id=user_id,
-                error=str(e)
-            )
-            disconnected.add(websocket)
-    
-    # Clean up disconnected websockets
-    for websocket in disconnected:
-        active_connections[user_id].discard(websocket)
-    
-    if not active_connections[user_id]:
-        del active_connections[user_id]
+    _broadcast_bytes(conn_ids, _encode(message))
     
     logger.info(
         "message_broadcasted",
         user_id=user_id,
-        connections=len(active_connections.get(user_id, set()))
+        connections=len(conn_ids)
     )
 
 
@@ -160,17 +326,19 @@ async def broadcast_to_all(message: dict):
     Args:
         message: Message dictionary to send
     """
-    for user_id in list(active_connections.keys()):
-        await broadcast_to_user(user_id, message)
+    # Serialized (and compressed) once for every connection of every user
+    payload = _encode(message)
+    for conn in _conns.values():
+        _enqueue(conn.queue, payload)
     
-    logger.info("message_broadcasted_to_all", total_users=len(active_connections))
+    logger.info("message_broadcasted_to_all", total_users=len(_by_user))
 
 
 def get_active_connections_count() -> int:
     """Get total number of active WebSocket connections."""
-    return sum(len(connections) for connections in active_connections.values())
+    return len(_conns)
 
 
 def get_active_users_count() -> int:
     """Get number of users with active connections."""
-    return len(active_connections)
+    return len(_by_user)
@@ -8,6 +8,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -15,8 +16,16 @@ from .config import settings
 from .models import User
 from .database import get_db
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: Argon2id for new hashes; bcrypt hashes still verify and
+# are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,  # KiB (64 MiB)
+    argon2__parallelism=1,
+)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/login")
@@ -161,7 +170,16 @@ async def authenticate_user(
     if not user:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    # Hashing is CPU-bound; keep it off the event loop
+    verified, new_hash = await run_in_threadpool(
+        pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not verified:
         return None
     
+    if new_hash:
+        # Stored hash uses a deprecated scheme or parameters
+        user.hashed_password = new_hash
+        await db.commit()
+    
     return user
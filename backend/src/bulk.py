@@ -0,0 +1,151 @@
+"""
+Bulk writes for scraper/NLP auction feeds.
+Rows are streamed into a temporary staging table with COPY and merged into
+auctions with a single INSERT ... ON CONFLICT, so a whole batch costs one
+transaction instead of one commit per auction.
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+import json
+import structlog
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Auction, PropertyType, AuctionStatus
+
+logger = structlog.get_logger()
+
+# Columns a feed may set; id, coordinates, generated and timestamp columns
+# are handled by the merge statement itself
+UPSERT_COLUMNS = [
+    column.name for column in Auction.__table__.columns
+    if column.name not in {
+        "id", "coordinates", "tsv", "scraped_at", "created_at", "updated_at"
+    }
+]
+
+JSON_COLUMNS = {"score_breakdown", "raw_data"}
+DATETIME_COLUMNS = {"auction_date"}
+ENUM_COLUMNS = {"property_type": PropertyType, "status": AuctionStatus}
+
+
+def _enum_name(enum_cls, value: Any) -> str:
+    """Return the PostgreSQL label (member name) for an enum member, name or value."""
+    if isinstance(value, enum_cls):
+        return value.name
+    if value in enum_cls.__members__:
+        return value
+    return enum_cls(value).name
+
+
+def _column_default(column_name: str) -> Any:
+    """Return the model's scalar Python-side default for a column, if any."""
+    default = Auction.__table__.columns[column_name].default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+def _to_record(row: Dict[str, Any]) -> tuple:
+    """Convert an auction payload into a COPY record for the staging table."""
+    record = []
+    for column in UPSERT_COLUMNS:
+        value = row[column] if column in row else _column_default(column)
+        if value is not None:
+            if column in JSON_COLUMNS:
+                value = json.dumps(value)
+            elif column in DATETIME_COLUMNS and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif column in ENUM_COLUMNS:
+                value = _enum_name(ENUM_COLUMNS[column], value)
+        record.append(value)
+
+    latitude = row.get("latitude")
+    longitude = row.get("longitude")
+    record.append(float(latitude) if latitude is not None else None)
+    record.append(float(longitude) if longitude is not None else None)
+    return tuple(record)
+
+
+async def bulk_upsert_auctions(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert or update many auctions in one round of COPY + merge.
+
+    Rows use the same payload as POST /auctions/scraper (optionally with
+    latitude/longitude). Rows are keyed by external_id; if a batch contains
+    the same external_id more than once, the last row wins. New auctions get
+    the model defaults for missing fields; existing auctions only have the
+    fields present in their own row overwritten, even when other rows in the
+    batch carry more fields. The caller owns the transaction
+    and must commit.
+
+    Args:
+        session: Database session
+        rows: Auction payloads
+
+    Returns:
+        Number of auctions inserted or updated
+
+    Raises:
+        ValueError: If a row has no external_id or an unknown enum value
+    """
+    by_external_id = {}
+    for row in rows:
+        if not row.get("external_id"):
+            raise ValueError("external_id is required")
+        by_external_id[row["external_id"]] = row
+    if not by_external_id:
+        return 0
+
+    # Rows are merged in groups sharing the same set of fields, so a row
+    # never overwrites an existing auction with defaults for fields it lacks
+    key_groups: Dict[frozenset, int] = {}
+    records = []
+    for row in by_external_id.values():
+        present = frozenset(
+            column for column in UPSERT_COLUMNS
+            if column in row and column != "external_id"
+        )
+        key_group = key_groups.setdefault(present, len(key_groups))
+        records.append(_to_record(row) + (key_group,))
+    columns = ", ".join(UPSERT_COLUMNS)
+
+    # Same column types as auctions (enums, JSONB); dropped at commit
+    await session.execute(text(
+        f"CREATE TEMP TABLE auctions_staging ON COMMIT DROP AS "
+        f"SELECT {columns}, NULL::float8 AS latitude, NULL::float8 AS longitude, "
+        f"NULL::int AS key_group "
+        f"FROM auctions WITH NO DATA"
+    ))
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "auctions_staging",
+        records=records,
+        columns=UPSERT_COLUMNS + ["latitude", "longitude", "key_group"]
+    )
+
+    upserted = 0
+    for present, key_group in key_groups.items():
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in UPSERT_COLUMNS
+            if column in present
+        )
+        result = await session.execute(text(
+            f"INSERT INTO auctions ({columns}, coordinates, scraped_at, created_at, updated_at) "
+            f"SELECT {columns}, "
+            f"CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL "
+            f"THEN ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography END, "
+            f"timezone('utc', now()), timezone('utc', now()), timezone('utc', now()) "
+            f"FROM auctions_staging WHERE key_group = :key_group "
+            f"ON CONFLICT (external_id) DO UPDATE SET "
+            f"{updates + ', ' if updates else ''}"
+            f"coordinates = COALESCE(EXCLUDED.coordinates, auctions.coordinates), "
+            f"scraped_at = EXCLUDED.scraped_at, "
+            f"updated_at = EXCLUDED.updated_at"
+        ), {"key_group": key_group})
+        upserted += result.rowcount
+
+    logger.info("auctions_bulk_upserted", count=upserted, groups=len(key_groups))
+    return upserted
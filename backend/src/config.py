@@ -3,7 +3,8 @@ Configuration management using Pydantic Settings.
 Loads settings from environment variables and .env file.
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Tuple
+from functools import cached_property
 import os
 
 
@@ -17,6 +18,11 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str = "auction_db"
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_COMMAND_TIMEOUT: int = 60  # seconds, client-side limit per statement
+    DB_PGBOUNCER: bool = False  # DATABASE_URL points at PgBouncer (transaction pooling)
     
     # API
     API_HOST: str = "0.0.0.0"
@@ -35,6 +41,9 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_URL: Optional[str] = None
+    MARKET_STATS_CACHE_TTL: int = 60  # seconds
+    MARKET_STATS_REFRESH_MINUTES: int = 5  # mv_market_stats refresh interval
+    HTTP_CACHE_MAX_AGE: int = 60  # seconds, Cache-Control for public read endpoints
     
     # Qdrant
     QDRANT_HOST: str = "qdrant"
@@ -68,6 +77,11 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
     
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
+        """CORS_ORIGINS parsed once into a tuple of origins."""
+        return tuple(origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip())
+    
     def get_database_url(self) -> str:
         """Get database URL."""
         if self.DATABASE_URL:
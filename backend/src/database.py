@@ -1,19 +1,43 @@
 """
 Database connection and session management.
 """
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import DeclarativeBase
 
 from .config import settings
 
-# Create async engine
+connect_args = {"command_timeout": settings.DB_COMMAND_TIMEOUT}
+if settings.DB_PGBOUNCER:
+    # In transaction pooling mode consecutive statements may run on different
+    # server connections, so prepared statements must not be cached and their
+    # names must be unique across clients
+    connect_args.update({
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    })
+else:
+    # Direct connections keep prepared statements for the repeated API
+    # queries; JIT only adds planning latency to these short OLTP queries
+    # (PgBouncer rejects server_settings in the startup packet)
+    connect_args.update({
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 512,
+        "server_settings": {"jit": "off"},
+    })
+
+# Create async engine. PgBouncer does the real pooling, so each worker only
+# keeps a few client connections open. SQL echo logs every statement
+# synchronously, so it is never enabled in production.
 engine = create_async_engine(
     settings.get_database_url(),
-    echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=20,
+    echo=settings.DEBUG and settings.ENVIRONMENT != "production",
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_timeout=30,
-    pool_recycle=3600,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=connect_args,
 )
 
 # Create async session factory
@@ -25,8 +49,8 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
-# Base for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base for all ORM models."""
 
 
 async def get_db():
@@ -4,13 +4,18 @@ Configures API routes, middleware, and WebSocket connections.
 """
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from prometheus_client import make_asgi_app
+import asyncio
 import structlog
+import contextlib
 from contextlib import asynccontextmanager
 
 from .config import settings
 from .database import engine, Base
+from . import models  # noqa: F401  (registers tables on Base.metadata)
+from .market_stats import run_market_stats_refresher
 from .api import auctions, users, preferences, websocket as ws_module
 
 # Configure structured logging
@@ -35,9 +40,14 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
+    stats_refresher = asyncio.create_task(run_market_stats_refresher())
+    
     yield
     
     logger.info("shutting_down_application")
+    stats_refresher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await stats_refresher
 
 
 # Create FastAPI application
@@ -47,13 +57,17 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Compress JSON responses (auction listings shrink several-fold)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS.split(","),
+    allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -122,5 +136,11 @@ if __name__ == "__main__":
         "main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_ping_interval=20,
+        ws_ping_timeout=10,
+        ws_per_message_deflate=False,
         reload=settings.DEBUG
     )
@@ -0,0 +1,71 @@
+"""
+Pre-aggregated market statistics.
+The mv_market_stats materialized view (migration 008) is refreshed
+periodically in the background so /stats/market reads a few hundred
+pre-aggregated rows instead of scanning auctions.
+"""
+import asyncio
+from datetime import datetime
+from sqlalchemy import Enum, Float, Integer, String, column, table, text
+import structlog
+
+from .cache import cache_set
+from .config import settings
+from .database import engine
+from .models import PropertyType
+
+logger = structlog.get_logger()
+
+# Arbitrary key so only one worker refreshes the view at a time
+REFRESH_LOCK_KEY = 0x6D765F6D6B74
+
+# Redis key holding the time of the last refresh; /stats/market derives its
+# ETag and cache keys from it
+MARKET_STATS_VERSION_KEY = "market_stats:version"
+
+market_stats_view = table(
+    "mv_market_stats",
+    column("city", String),
+    column("property_type", Enum(PropertyType)),
+    column("price_range", String),
+    column("n", Integer),
+    column("sum_price", Float),
+    column("n_scored", Integer),
+    column("sum_score", Float),
+)
+
+
+async def refresh_market_stats_view() -> bool:
+    """
+    Refresh mv_market_stats without blocking readers.
+
+    Returns:
+        True if refreshed, False if another worker holds the refresh lock
+    """
+    # Transaction-scoped lock, so it also holds behind PgBouncer
+    async with engine.begin() as conn:
+        locked = await conn.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        )
+        if not locked:
+            return False
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_market_stats"))
+
+    await cache_set(
+        MARKET_STATS_VERSION_KEY,
+        datetime.utcnow().isoformat(),
+        settings.MARKET_STATS_REFRESH_MINUTES * 60 * 2
+    )
+
+    logger.info("market_stats_view_refreshed")
+    return True
+
+
+async def run_market_stats_refresher():
+    """Refresh the market stats view now and every MARKET_STATS_REFRESH_MINUTES until cancelled."""
+    while True:
+        try:
+            await refresh_market_stats_view()
+        except Exception as e:
+            logger.error("market_stats_view_refresh_failed", error=str(e))
+        await asyncio.sleep(settings.MARKET_STATS_REFRESH_MINUTES * 60)
@@ -1,15 +1,16 @@
 """
 Database models using SQLAlchemy ORM with PostGIS support.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Enum
-from sqlalchemy.orm import relationship
-from sqlalchemy.ext.declarative import declarative_base
-from geoalchemy2 import Geometry
+from sqlalchemy import Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Enum, Index, Computed, text, func, cast
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from geoalchemy2 import Geography, Geometry
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import enum
 
-Base = declarative_base()
+from .database import Base
 
 
 class PropertyType(str, enum.Enum):
@@ -38,183 +39,241 @@ class User(Base):
     """User model."""
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_admin: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    preferences = relationship("SearchPreference", back_populates="user", cascade="all, delete-orphan")
-    notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
+    preferences: Mapped[List["SearchPreference"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    notifications: Mapped[List["Notification"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
 
 class Auction(Base):
     """Auction model with geospatial support."""
     __tablename__ = "auctions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    external_id = Column(String(255), unique=True, index=True, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    external_id: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     
     # Basic information
-    title = Column(String(500), nullable=False)
-    description = Column(Text)
-    property_type = Column(Enum(PropertyType), nullable=False)
+    title: Mapped[str] = mapped_column(String(500), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    property_type: Mapped[PropertyType] = mapped_column(Enum(PropertyType), nullable=False)
     
     # Location
-    city = Column(String(100), index=True)
-    province = Column(String(100))
-    address = Column(String(500))
-    coordinates = Column(Geometry('POINT', srid=4326))  # PostGIS point
+    city: Mapped[Optional[str]] = mapped_column(String(100))
+    province: Mapped[Optional[str]] = mapped_column(String(100))
+    address: Mapped[Optional[str]] = mapped_column(String(500))
+    coordinates: Mapped[Optional[Any]] = mapped_column(Geography('POINT', srid=4326))  # PostGIS point, distances in meters
     
     # Property details
-    surface_sqm = Column(Float)
-    rooms = Column(Integer)
-    bathrooms = Column(Integer)
-    floor = Column(Integer)
+    surface_sqm: Mapped[Optional[float]] = mapped_column(Float)
+    rooms: Mapped[Optional[int]] = mapped_column(Integer)
+    bathrooms: Mapped[Optional[int]] = mapped_column(Integer)
+    floor: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Auction details
-    base_price = Column(Float, nullable=False)
-    current_price = Column(Float)
-    estimated_value = Column(Float)
-    auction_date = Column(DateTime, index=True)
-    auction_round = Column(Integer, default=1)
-    court = Column(String(200))
-    case_number = Column(String(100))
+    base_price: Mapped[float] = mapped_column(Float, nullable=False)
+    current_price: Mapped[Optional[float]] = mapped_column(Float)
+    estimated_value: Mapped[Optional[float]] = mapped_column(Float)
+    auction_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
+    auction_round: Mapped[Optional[int]] = mapped_column(Integer, default=1)
+    court: Mapped[Optional[str]] = mapped_column(String(200))
+    case_number: Mapped[Optional[str]] = mapped_column(String(100))
     
     # Status
-    status = Column(Enum(AuctionStatus), default=AuctionStatus.ACTIVE, index=True)
-    is_occupied = Column(Boolean, default=False)
+    status: Mapped[Optional[AuctionStatus]] = mapped_column(Enum(AuctionStatus), default=AuctionStatus.ACTIVE, index=True)
+    is_occupied: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     
     # AI Ranking
-    ai_score = Column(Float, index=True)  # 0-100
-    score_breakdown = Column(JSON)  # Detailed score components
+    ai_score: Mapped[Optional[float]] = mapped_column(Float)  # 0-100
+    score_breakdown: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)  # Detailed score components
     
     # Metadata
-    source_url = Column(String(500))
-    raw_data = Column(JSON)
-    scraped_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    source_url: Mapped[Optional[str]] = mapped_column(String(500))
+    raw_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    scraped_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Vector embedding reference
-    embedding_id = Column(String(100))  # Qdrant point ID
+    embedding_id: Mapped[Optional[str]] = mapped_column(String(100))  # Qdrant point ID
     
-    @property
-    def latitude(self) -> Optional[float]:
-        """Extract latitude from PostGIS coordinates."""
-        if self.coordinates is None:
+    # Full-text search document, maintained by PostgreSQL (see migration 005)
+    tsv: Mapped[Optional[Any]] = mapped_column(TSVECTOR, Computed(
+        "setweight(to_tsvector('italian', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('italian', coalesce(city, '')), 'B') || "
+        "setweight(to_tsvector('italian', coalesce(address, '')), 'C') || "
+        "setweight(to_tsvector('italian', coalesce(description, '')), 'D')",
+        persisted=True
+    ), deferred=True)
+    
+    __table_args__ = (
+        # Partial indexes for list_auctions (see migrations 002 and 004)
+        Index(
+            "ix_auctions_active_score",
+            ai_score.desc().nullslast(),
+            id.desc(),
+            postgresql_include=["base_price", "city", "property_type"],
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        Index(
+            "ix_auctions_active_city_score",
+            city,
+            ai_score.desc().nullslast(),
+            id.desc(),
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        Index(
+            "ix_auctions_active_type_score",
+            property_type,
+            ai_score.desc().nullslast(),
+            id.desc(),
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        Index("ix_auctions_tsv", "tsv", postgresql_using="gin"),
+    )
+    
+    def _point_xy(self) -> Optional[tuple]:
+        """
+        Return (longitude, latitude) decoded from the coordinates WKB.
+        
+        Decoded once per coordinates value and memoized on the instance.
+        """
+        coordinates = self.coordinates
+        if coordinates is None:
             return None
+        cached = self.__dict__.get("_point_xy_cache")
+        if cached is not None and cached[0] is coordinates:
+            return cached[1]
         try:
             import struct
             from geoalchemy2.elements import WKBElement
             
             # Handle WKBElement type
             coords_data = None
-            if isinstance(self.coordinates, WKBElement):
-                coords_data = bytes(self.coordinates.data)
-            elif isinstance(self.coordinates, bytes):
-                coords_data = self.coordinates
+            if isinstance(coordinates, WKBElement):
+                coords_data = bytes(coordinates.data)
+            elif isinstance(coordinates, bytes):
+                coords_data = coordinates
             
+            xy = None
             if coords_data:
-                # PostGIS EWKB format: byte order (1) + type (4) + SRID (4) + X (8) + Y (8)
+                # WKB POINT: byte order (1) + type (4) [+ SRID (4) in EWKB] + X (8) + Y (8);
+                # X and Y are always the last 16 bytes
                 byte_order = '<' if coords_data[0] == 1 else '>'
-                y_offset = 9 + 8  # Skip header (9 bytes) + X coordinate (8 bytes)
-                latitude = struct.unpack(byte_order + 'd', coords_data[y_offset:y_offset+8])[0]
-                return float(latitude)
-            return None
+                x, y = struct.unpack_from(byte_order + 'dd', coords_data, len(coords_data) - 16)
+                xy = (float(x), float(y))
+            self.__dict__["_point_xy_cache"] = (coordinates, xy)
+            return xy
         except Exception as e:
             import logging
-            logging.error(f"Error extracting latitude: {e}, type: {type(self.coordinates)}")
+            logging.error(f"Error extracting coordinates: {e}, type: {type(coordinates)}")
             return None
     
-    @property
+    @hybrid_property
+    def latitude(self) -> Optional[float]:
+        """Extract latitude from PostGIS coordinates."""
+        xy = self._point_xy()
+        return xy[1] if xy else None
+    
+    @latitude.expression
+    def latitude(cls):
+        """Latitude computed by PostGIS, usable in select/where/order_by."""
+        return func.ST_Y(cast(cls.coordinates, Geometry("POINT", srid=4326))).label("latitude")
+    
+    @hybrid_property
     def longitude(self) -> Optional[float]:
         """Extract longitude from PostGIS coordinates."""
-        if self.coordinates is None:
-            return None
-        try:
-            import struct
-            from geoalchemy2.elements import WKBElement
-            
-            # Handle WKBElement type
-            coords_data = None
-            if isinstance(self.coordinates, WKBElement):
-                coords_data = bytes(self.coordinates.data)
-            elif isinstance(self.coordinates, bytes):
-                coords_data = self.coordinates
-            
-            if coords_data:
-                # PostGIS EWKB format: byte order (1) + type (4) + SRID (4) + X (8) + Y (8)
-                byte_order = '<' if coords_data[0] == 1 else '>'
-                x_offset = 9  # Skip header (byte order + type + SRID)
-                longitude = struct.unpack(byte_order + 'd', coords_data[x_offset:x_offset+8])[0]
-                return float(longitude)
-            return None
-        except Exception as e:
-            import logging
-            logging.error(f"Error extracting longitude: {e}, type: {type(self.coordinates)}")
-            return None
+        xy = self._point_xy()
+        return xy[0] if xy else None
+    
+    @longitude.expression
+    def longitude(cls):
+        """Longitude computed by PostGIS, usable in select/where/order_by."""
+        return func.ST_X(cast(cls.coordinates, Geometry("POINT", srid=4326))).label("longitude")
 
 
 class SearchPreference(Base):
     """User search preferences for notifications."""
     __tablename__ = "search_preferences"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     
-    name = Column(String(200), nullable=False)
-    filters = Column(JSON, nullable=False)  # Search filters as JSON
-    notify = Column(Boolean, default=True)
-    is_active = Column(Boolean, default=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    filters: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)  # Search filters as JSON
+    notify: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    user = relationship("User", back_populates="preferences")
+    user: Mapped["User"] = relationship(back_populates="preferences")
+    
+    __table_args__ = (
+        # Containment (@>) lookups on filters (see migration 003)
+        Index(
+            "ix_pref_filters_gin",
+            text("filters jsonb_path_ops"),
+            postgresql_using="gin",
+        ),
+        # list_preferences: index range scan in output order (see migration 010)
+        Index("ix_pref_user_created", user_id, created_at.desc()),
+        # One active preference per name and user
+        Index(
+            "ix_pref_user_name",
+            user_id,
+            name,
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+    )
 
 
 class Notification(Base):
     """User notifications."""
     __tablename__ = "notifications"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    auction_id = Column(Integer, ForeignKey("auctions.id"))
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    auction_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("auctions.id"))
     
-    type = Column(String(50), nullable=False)  # new_auction, price_drop, ending_soon
-    title = Column(String(200), nullable=False)
-    message = Column(Text)
-    data = Column(JSON)
+    type: Mapped[str] = mapped_column(String(50), nullable=False)  # new_auction, price_drop, ending_soon
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    message: Mapped[Optional[str]] = mapped_column(Text)
+    data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
     
-    is_read = Column(Boolean, default=False)
-    sent_at = Column(DateTime, default=datetime.utcnow)
-    read_at = Column(DateTime)
+    is_read: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    read_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
     # Relationships
-    user = relationship("User", back_populates="notifications")
-    auction = relationship("Auction")
+    user: Mapped["User"] = relationship(back_populates="notifications")
+    # Must be loaded explicitly (selectinload); lazy loads fail under asyncio
+    auction: Mapped[Optional["Auction"]] = relationship(lazy="raise")
 
 
 class ScrapingLog(Base):
     """Log of scraping activities."""
     __tablename__ = "scraping_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
-    source = Column(String(100), nullable=False)
-    started_at = Column(DateTime, nullable=False)
-    completed_at = Column(DateTime)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    source: Mapped[str] = mapped_column(String(100), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
-    auctions_found = Column(Integer, default=0)
-    auctions_new = Column(Integer, default=0)
-    auctions_updated = Column(Integer, default=0)
-    errors_count = Column(Integer, default=0)
+    auctions_found: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    auctions_new: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    auctions_updated: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    errors_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     
-    status = Column(String(50), default="running")  # running, completed, failed
-    error_message = Column(Text)
+    status: Mapped[Optional[str]] = mapped_column(String(50), default="running")  # running, completed, failed
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for request/response validation.
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, field_validator, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -40,6 +40,9 @@ class UserCreate(UserBase):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+    
+    class Config:
+        frozen = True
 
 
 class UserResponse(UserBase):
@@ -110,10 +113,15 @@ class AuctionResponse(AuctionBase):
 
 class AuctionListResponse(BaseModel):
     items: List[AuctionResponse]
-    total: int
+    total: int  # Planner estimate for large unfiltered listings; cursor pages repeat the first page's total
     page: int
     page_size: int
     pages: int
+    next_cursor: Optional[str] = None  # Keyset cursor for the following page
+
+
+# Validates a whole page of ORM rows in a single pydantic-core call
+AuctionListAdapter = TypeAdapter(List[AuctionResponse])
 
 
 class AuctionFilters(BaseModel):
@@ -133,6 +141,9 @@ class AuctionFilters(BaseModel):
     lat: Optional[float] = None
     lon: Optional[float] = None
     radius_km: Optional[float] = None
+    
+    class Config:
+        frozen = True
 
 
 # Search Preference Schemas
@@ -142,8 +153,22 @@ class SearchPreferenceBase(BaseModel):
     notify: bool = True
 
 
+def _validate_preference_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Validate saved-search filters against AuctionFilters.
+    
+    Preferences are matched in SQL straight from the stored JSON, so only
+    the keys that were set are stored, with JSON-native values.
+    """
+    if filters is None:
+        return None
+    return AuctionFilters.model_validate(filters).model_dump(
+        mode="json", exclude_unset=True, exclude_none=True
+    )
+
+
 class SearchPreferenceCreate(SearchPreferenceBase):
-    pass
+    _validate_filters = field_validator("filters")(_validate_preference_filters)
 
 
 class SearchPreferenceUpdate(BaseModel):
@@ -151,6 +176,8 @@ class SearchPreferenceUpdate(BaseModel):
     filters: Optional[Dict[str, Any]] = None
     notify: Optional[bool] = None
     is_active: Optional[bool] = None
+    
+    _validate_filters = field_validator("filters")(_validate_preference_filters)
 
 
 class SearchPreferenceResponse(SearchPreferenceBase):
@@ -164,6 +191,12 @@ class SearchPreferenceResponse(SearchPreferenceBase):
         from_attributes = True
 
 
+class PreferenceMatch(BaseModel):
+    """An auction matching a saved search."""
+    preference_id: int
+    auction_id: int
+
+
 # Notification Schemas
 class NotificationBase(BaseModel):
     type: str
@@ -175,6 +208,9 @@ class NotificationCreate(NotificationBase):
     user_id: int
     auction_id: Optional[int] = None
     data: Optional[Dict[str, Any]] = None
+    
+    class Config:
+        frozen = True
 
 
 class NotificationResponse(NotificationBase):
@@ -195,6 +231,9 @@ class SearchQuery(BaseModel):
     q: str = Field(..., min_length=1)
     top_k: int = Field(20, ge=1, le=100)
     filters: Optional[AuctionFilters] = None
+    
+    class Config:
+        frozen = True
 
 
 class SearchResult(BaseModel):
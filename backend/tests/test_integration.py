@@ -2,59 +2,129 @@
 Acceptance and integration tests.
 Tests full system flow from scraping to API responses.
 """
+import asyncio
+import uuid
 import pytest
+import pytest_asyncio
 import httpx
-from sqlalchemy import select, func
+import numpy as np
+from sqlalchemy import select, func, case, and_, text, delete
 from datetime import datetime
 
+from src.bulk import bulk_upsert_auctions
 from src.database import AsyncSessionLocal
 from src.models import Auction, User, SearchPreference
 
 
-@pytest.mark.asyncio
-async def test_system_startup_time():
+@pytest_asyncio.fixture(scope="session")
+async def http():
+    """One keep-alive HTTP client to the backend shared by all tests."""
+    async with httpx.AsyncClient(
+        base_url="http://backend:8000",
+        timeout=5,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio(scope="session")
+async def test_system_startup_time(http):
     """Test that system starts within acceptable time."""
     # This test would be run in CI with docker-compose
     # Here we just verify API is accessible
-    async with httpx.AsyncClient() as client:
-        response = await client.get("http://backend:8000/health")
-        assert response.status_code == 200
-        assert response.json()["status"] == "healthy"
+    response = await http.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+async def approx_count(session, table: str) -> int:
+    """Planner row estimate for a table (-1 if never analyzed), without scanning it."""
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    )
+    return result.scalar() or 0
 
 
 @pytest.mark.asyncio
 async def test_sample_data_import():
     """Test that sample data was imported successfully."""
     async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(func.count()).select_from(Auction)
-        )
-        count = result.scalar()
+        count = await approx_count(session, "auctions")
+        
+        # The estimate lags right after an import; only then count exactly
+        if count < 50:
+            result = await session.execute(
+                select(func.count()).select_from(Auction)
+            )
+            count = result.scalar()
         
         # Should have at least 50 auctions from sample data
         assert count >= 50, f"Expected at least 50 auctions, found {count}"
 
 
+@pytest.mark.asyncio
+async def test_bulk_upsert_keeps_fields_missing_from_row():
+    """Test that a mixed batch only overwrites the fields each row carries."""
+    suffix = uuid.uuid4().hex[:8]
+    scored_id, plain_id = f"test-bulk-scored-{suffix}", f"test-bulk-plain-{suffix}"
+    base = {"title": "Appartamento di test", "property_type": "Appartamento", "base_price": 100000.0}
+    
+    async with AsyncSessionLocal() as session:
+        try:
+            await bulk_upsert_auctions(session, [
+                {**base, "external_id": scored_id, "ai_score": 80.0, "status": "suspended"},
+                {**base, "external_id": plain_id, "ai_score": 60.0, "status": "suspended"},
+            ])
+            await session.commit()
+            
+            # Rows with different keys: only the first one carries ai_score
+            upserted = await bulk_upsert_auctions(session, [
+                {**base, "external_id": scored_id, "ai_score": 90.0},
+                {**base, "external_id": plain_id, "city": "Roma"},
+            ])
+            await session.commit()
+            assert upserted == 2
+            
+            result = await session.execute(
+                select(Auction.external_id, Auction.ai_score, Auction.city, Auction.status)
+                .where(Auction.external_id.in_([scored_id, plain_id]))
+            )
+            rows = {row.external_id: row for row in result}
+            assert rows[scored_id].ai_score == 90.0
+            assert rows[plain_id].ai_score == 60.0
+            assert rows[plain_id].city == "Roma"
+            assert all(row.status.value == "suspended" for row in rows.values())
+        finally:
+            await session.execute(
+                delete(Auction).where(Auction.external_id.in_([scored_id, plain_id]))
+            )
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_nlp_extraction_precision():
     """Test NLP extraction meets minimum precision threshold."""
     async with AsyncSessionLocal() as session:
-        # Get auctions with extracted data
+        # Count auctions with extracted data and all auctions in one query
         result = await session.execute(
-            select(Auction).where(
-                Auction.city.isnot(None),
-                Auction.surface_sqm.isnot(None),
-                Auction.base_price.isnot(None)
-            )
+            select(
+                func.sum(case(
+                    (and_(
+                        Auction.city.isnot(None),
+                        Auction.surface_sqm.isnot(None),
+                        Auction.base_price.isnot(None)
+                    ), 1),
+                    else_=0
+                )),
+                func.count()
+            ).select_from(Auction)
         )
-        auctions_with_data = result.scalars().all()
-        
-        total = await session.execute(select(func.count()).select_from(Auction))
-        total_count = total.scalar()
+        complete_count, total_count = result.one()
         
         # Calculate precision (auctions with complete data / total auctions)
         if total_count > 0:
-            precision = len(auctions_with_data) / total_count
+            precision = complete_count / total_count
             
             # Should have >= 85% precision
             assert precision >= 0.85, f"NLP precision {precision:.2%} below threshold 85%"
@@ -64,24 +134,22 @@ async def test_nlp_extraction_precision():
 async def test_ranking_correlation():
     """Test that AI ranking correlates with market estimates."""
     async with AsyncSessionLocal() as session:
+        # Only the three columns needed, as rows of plain floats
         result = await session.execute(
-            select(Auction).where(
+            select(Auction.ai_score, Auction.estimated_value, Auction.base_price).where(
                 Auction.ai_score.isnot(None),
                 Auction.estimated_value.isnot(None),
                 Auction.base_price.isnot(None)
             )
         )
-        auctions = result.scalars().all()
+        data = np.array(result.all(), dtype=np.float64)
         
-        if len(auctions) < 10:
+        if len(data) < 10:
             pytest.skip("Not enough data for correlation test")
         
         # Calculate discount percentages
-        discounts = [
-            (a.estimated_value - a.base_price) / a.estimated_value
-            for a in auctions
-        ]
-        scores = [a.ai_score for a in auctions]
+        scores, estimated_values, base_prices = data.T
+        discounts = (estimated_values - base_prices) / estimated_values
         
         # Calculate Spearman correlation (simplified)
         from scipy.stats import spearmanr
@@ -91,101 +159,99 @@ async def test_ranking_correlation():
         assert correlation >= 0.5, f"Ranking correlation {correlation:.2f} below threshold 0.5"
 
 
-@pytest.mark.asyncio
-async def test_api_response_time():
+@pytest.mark.asyncio(scope="session")
+async def test_api_response_time(http):
     """Test API response time meets performance requirements."""
     import time
     
-    async with httpx.AsyncClient() as client:
-        times = []
-        
-        # Make 100 requests to measure P95
-        for _ in range(100):
-            start = time.time()
-            response = await client.get("http://backend:8000/api/v1/auctions?page_size=20")
-            end = time.time()
-            
-            assert response.status_code == 200
-            times.append((end - start) * 1000)  # Convert to ms
-        
-        # Calculate P95
-        times.sort()
-        p95_index = int(len(times) * 0.95)
-        p95_latency = times[p95_index]
+    # 100 requests, at most 10 in flight, as concurrent clients would
+    semaphore = asyncio.Semaphore(10)
+    
+    async def timed_request() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await http.get("/api/v1/auctions?page_size=20")
+            elapsed = (time.perf_counter() - start) * 1000  # Convert to ms
         
-        # P95 should be < 500ms
-        assert p95_latency < 500, f"P95 latency {p95_latency:.0f}ms exceeds 500ms threshold"
+        assert response.status_code == 200
+        return elapsed
+    
+    times = await asyncio.gather(*[timed_request() for _ in range(100)])
+    
+    # Calculate P95
+    p95_latency = np.percentile(times, 95)
+    
+    # P95 should be < 500ms
+    assert p95_latency < 500, f"P95 latency {p95_latency:.0f}ms exceeds 500ms threshold"
 
 
-@pytest.mark.asyncio
-async def test_end_to_end_user_flow():
+@pytest.mark.asyncio(scope="session")
+async def test_end_to_end_user_flow(http):
     """Test complete user flow from registration to receiving notifications."""
-    base_url = "http://backend:8000/api/v1"
+    base_url = "/api/v1"
     
-    async with httpx.AsyncClient() as client:
-        # 1. Register user
-        register_data = {
-            "email": "test@example.com",
-            "password": "securepass123"
-        }
-        response = await client.post(f"{base_url}/users/register", json=register_data)
-        assert response.status_code in [201, 400]  # 400 if already exists
-        
-        # 2. Login
-        response = await client.post(f"{base_url}/users/login", json=register_data)
-        assert response.status_code == 200
-        token = response.json()["access_token"]
-        
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        # 3. Get auctions list
-        response = await client.get(f"{base_url}/auctions", headers=headers)
-        assert response.status_code == 200
-        auctions = response.json()
-        assert auctions["total"] > 0
-        
-        # 4. Get specific auction
-        auction_id = auctions["items"][0]["id"]
-        response = await client.get(f"{base_url}/auctions/{auction_id}", headers=headers)
-        assert response.status_code == 200
-        auction = response.json()
-        assert auction["ai_score"] is not None
-        
-        # 5. Create search preference
-        preference_data = {
-            "name": "My Test Search",
-            "filters": {"city": "Roma", "min_score": 70},
-            "notify": True
-        }
-        response = await client.post(f"{base_url}/preferences", json=preference_data, headers=headers)
-        assert response.status_code == 201
-        
-        # 6. List preferences
-        response = await client.get(f"{base_url}/preferences", headers=headers)
-        assert response.status_code == 200
-        preferences = response.json()
-        assert len(preferences) > 0
+    # 1. Register user
+    register_data = {
+        "email": "test@example.com",
+        "password": "securepass123"
+    }
+    response = await http.post(f"{base_url}/users/register", json=register_data)
+    assert response.status_code in [201, 400]  # 400 if already exists
+    
+    # 2. Login
+    response = await http.post(f"{base_url}/users/login", json=register_data)
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # 3. Get auctions list
+    response = await http.get(f"{base_url}/auctions", headers=headers)
+    assert response.status_code == 200
+    auctions = response.json()
+    assert auctions["total"] > 0
+    
+    # 4. Get specific auction
+    auction_id = auctions["items"][0]["id"]
+    response = await http.get(f"{base_url}/auctions/{auction_id}", headers=headers)
+    assert response.status_code == 200
+    auction = response.json()
+    assert auction["ai_score"] is not None
+    
+    # 5. Create search preference (active names are unique per user)
+    preference_data = {
+        "name": f"My Test Search {uuid.uuid4().hex[:8]}",
+        "filters": {"city": "Roma", "min_score": 70},
+        "notify": True
+    }
+    response = await http.post(f"{base_url}/preferences", json=preference_data, headers=headers)
+    assert response.status_code == 201
+    
+    # 6. List preferences
+    response = await http.get(f"{base_url}/preferences", headers=headers)
+    assert response.status_code == 200
+    preferences = response.json()
+    assert preference_data["name"] in [preference["name"] for preference in preferences]
 
 
-@pytest.mark.asyncio
-async def test_vector_search_functionality():
+@pytest.mark.asyncio(scope="session")
+async def test_vector_search_functionality(http):
     """Test semantic search returns relevant results."""
-    async with httpx.AsyncClient() as client:
-        # Search for apartments in Rome
-        response = await client.get(
-            "http://backend:8000/api/v1/auctions/search/text?q=appartamento roma centro"
-        )
-        assert response.status_code == 200
-        results = response.json()
-        
-        # Should return results
-        assert results["total"] > 0
-        
-        # Results should be relevant (contain search terms)
-        for item in results["items"][:5]:
-            text = f"{item['title']} {item.get('description', '')} {item.get('city', '')}".lower()
-            # At least one search term should appear
-            assert any(term in text for term in ["appartamento", "roma", "centro"])
+    # Search for apartments in Rome
+    response = await http.get(
+        "/api/v1/auctions/search/text?q=appartamento roma centro"
+    )
+    assert response.status_code == 200
+    results = response.json()
+    
+    # Should return results
+    assert results["total"] > 0
+    
+    # Results should be relevant (contain search terms)
+    for item in results["items"][:5]:
+        text = f"{item['title']} {item.get('description', '')} {item.get('city', '')}".lower()
+        # At least one search term should appear
+        assert any(term in text for term in ["appartamento", "roma", "centro"])
 
 
 def test_coverage_threshold():
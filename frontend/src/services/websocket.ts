@@ -7,6 +7,8 @@ class WebSocketService {
   private reconnectInterval: number = 5000;
   private reconnectTimer: NodeJS.Timeout | null = null;
   private listeners: Map<string, Set<(data: any) => void>> = new Map();
+  // Keeps messages in order while compressed frames are being inflated
+  private received: Promise<void> = Promise.resolve();
 
   connect(token: string): void {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
@@ -16,6 +18,8 @@ class WebSocketService {
 
     try {
       this.ws = new WebSocket(`${WS_URL}/api/v1/ws?token=${token}`);
+      // Large broadcasts arrive as zlib-compressed binary frames
+      this.ws.binaryType = 'arraybuffer';
 
       this.ws.onopen = () => {
         console.log('WebSocket connected');
@@ -26,12 +30,7 @@ class WebSocketService {
       };
 
       this.ws.onmessage = (event) => {
-        try {
-          const message: WebSocketMessage = JSON.parse(event.data);
-          this.notifyListeners(message.type, message.data);
-        } catch (error) {
-          console.error('Error parsing WebSocket message:', error);
-        }
+        this.received = this.received.then(() => this.handleMessage(event.data));
       };
 
       this.ws.onerror = (error) => {
@@ -48,6 +47,24 @@ class WebSocketService {
     }
   }
 
+  private async handleMessage(data: string | ArrayBuffer): Promise<void> {
+    try {
+      const text = typeof data === 'string' ? data : await this.inflate(data);
+      const message = JSON.parse(text);
+      // Messages queued during a burst arrive coalesced into one frame
+      const messages: WebSocketMessage[] =
+        message.type === 'batch' ? message.items : [message];
+      messages.forEach((item) => this.notifyListeners(item.type, item.data));
+    } catch (error) {
+      console.error('Error parsing WebSocket message:', error);
+    }
+  }
+
+  private inflate(data: ArrayBuffer): Promise<string> {
+    const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate'));
+    return new Response(stream).text();
+  }
+
   disconnect(): void {
     if (this.reconnectTimer) {
       clearTimeout(this.reconnectTimer);
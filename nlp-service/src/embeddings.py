@@ -3,11 +3,27 @@ Embedding generation and vector storage.
 Uses sentence-transformers or OpenAI for embeddings.
 """
 import os
+import asyncio
+import threading
 from typing import List, Optional, Dict, Any
+import numpy as np
+import redis
 import structlog
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-import hashlib
+import xxhash
+from cachetools import LRUCache
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    HnswConfigDiff,
+    SearchParams,
+    QuantizationSearchParams,
+)
+import uuid
 
 logger = structlog.get_logger()
 
@@ -15,53 +31,268 @@ logger = structlog.get_logger()
 EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'sentence-transformers')
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'paraphrase-multilingual-MiniLM-L12-v2')
 EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '384'))
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))  # texts per forward pass
+EMBEDDING_FP16 = os.getenv('EMBEDDING_FP16', 'true').lower() == 'true'  # GPU only
 
-if EMBEDDING_PROVIDER == 'sentence-transformers':
-    try:
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer(EMBEDDING_MODEL)
-        logger.info("loaded_sentence_transformer", model=EMBEDDING_MODEL)
-    except ImportError:
-        logger.error("sentence_transformers_not_installed")
-        model = None
-elif EMBEDDING_PROVIDER == 'openai':
-    try:
-        import openai
+# Dynamic batching of concurrent /process requests
+EMBEDDING_MAX_BATCH = int(os.getenv('EMBEDDING_MAX_BATCH', '32'))
+EMBEDDING_MAX_WAIT_MS = int(os.getenv('EMBEDDING_MAX_WAIT_MS', '20'))
+
+# Embedding cache: in-process LRU in front of Redis, keyed by text hash
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', '10000'))
+EMBEDDING_CACHE_TTL = int(os.getenv('EMBEDDING_CACHE_TTL', '604800'))  # seconds
+
+# Loaded by load_embedding_model() at application startup
+model = None
+
+
+def load_embedding_model() -> None:
+    """
+    Load the configured embedding model and warm it up.
+    
+    Runs once per worker process from the app lifespan (in a thread, it
+    blocks for seconds), so importing this module stays cheap.
+    """
+    global model
+    
+    if EMBEDDING_PROVIDER == 'sentence-transformers':
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            logger.error("sentence_transformers_not_installed")
+            return
+        
+        st_model = SentenceTransformer(EMBEDDING_MODEL)
+        # Half precision halves memory traffic on GPU; CPUs lack fast fp16
+        # kernels, so the CPU model stays in fp32
+        if EMBEDDING_FP16 and st_model.device.type == 'cuda':
+            st_model.half()
+        # A dummy batch sets up the CUDA context and kernels before the
+        # first real request pays for it
+        st_model.encode(["warmup"] * 8, batch_size=8)
+        model = st_model
+        logger.info(
+            "loaded_sentence_transformer",
+            model=EMBEDDING_MODEL,
+            device=str(model.device),
+            dtype=str(next(model.parameters()).dtype)
+        )
+    elif EMBEDDING_PROVIDER == 'openai':
+        try:
+            import openai
+        except ImportError:
+            logger.error("openai_not_installed")
+            return
         openai.api_key = os.getenv('OPENAI_API_KEY')
         model = 'openai'
         logger.info("configured_openai_embeddings")
-    except ImportError:
-        logger.error("openai_not_installed")
-        model = None
-else:
-    model = None
-    logger.warning("no_embedding_provider")
+    else:
+        logger.warning("no_embedding_provider")
 
 # Initialize Qdrant client
 QDRANT_URL = os.getenv('QDRANT_URL', 'http://qdrant:6333')
 QDRANT_COLLECTION = os.getenv('QDRANT_COLLECTION', 'auctions')
 
+# HNSW index tuning (build-time settings apply when the collection is created)
+QDRANT_HNSW_M = int(os.getenv('QDRANT_HNSW_M', '32'))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv('QDRANT_HNSW_EF_CONSTRUCT', '200'))
+QDRANT_FULL_SCAN_THRESHOLD = int(os.getenv('QDRANT_FULL_SCAN_THRESHOLD', '10000'))  # KB
+QDRANT_HNSW_EF = int(os.getenv('QDRANT_HNSW_EF', '128'))  # per-query beam width
+
+# Batched upserts
+QDRANT_UPSERT_BATCH = int(os.getenv('QDRANT_UPSERT_BATCH', '128'))
+QDRANT_UPSERT_WAIT_MS = int(os.getenv('QDRANT_UPSERT_WAIT_MS', '50'))
+
+QDRANT_PREFER_GRPC = os.getenv('QDRANT_PREFER_GRPC', 'true').lower() == 'true'
+QDRANT_GRPC_PORT = int(os.getenv('QDRANT_GRPC_PORT', '6334'))
+
+# Async client (gRPC when available) so Qdrant calls never block the event
+# loop; connections are opened on first use
 try:
-    qdrant_client = QdrantClient(url=QDRANT_URL)
-    
-    # Create collection if it doesn't exist
-    try:
-        qdrant_client.get_collection(QDRANT_COLLECTION)
-    except Exception:
-        qdrant_client.create_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config=VectorParams(
-                size=EMBEDDING_DIMENSION,
-                distance=Distance.COSINE
-            )
-        )
-        logger.info("created_qdrant_collection", collection=QDRANT_COLLECTION)
+    qdrant_client = AsyncQdrantClient(
+        url=QDRANT_URL,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        grpc_port=QDRANT_GRPC_PORT
+    )
 except Exception as e:
     logger.error("qdrant_connection_failed", error=str(e))
     qdrant_client = None
 
 
-def generate_embedding(text: str) -> List[float]:
+async def ensure_qdrant_collection() -> None:
+    """Create the auctions collection if it doesn't exist yet."""
+    if not qdrant_client:
+        return
+    
+    try:
+        if not await qdrant_client.collection_exists(QDRANT_COLLECTION):
+            await qdrant_client.create_collection(
+                collection_name=QDRANT_COLLECTION,
+                # Full-precision vectors live on disk; searches run on int8
+                # copies kept in RAM and rescore the candidates
+                vectors_config=VectorParams(
+                    size=EMBEDDING_DIMENSION,
+                    distance=Distance.COSINE,
+                    on_disk=True
+                ),
+                hnsw_config=HnswConfigDiff(
+                    m=QDRANT_HNSW_M,
+                    ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+                    full_scan_threshold=QDRANT_FULL_SCAN_THRESHOLD
+                ),
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                )
+            )
+            logger.info("created_qdrant_collection", collection=QDRANT_COLLECTION)
+    except Exception as e:
+        logger.error("qdrant_connection_failed", error=str(e))
+
+
+# Connections are opened lazily on first use
+redis_client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+_memory_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+_memory_cache_lock = threading.Lock()
+_cache_stats = {'lookups': 0, 'memory_hits': 0, 'redis_hits': 0}
+
+_ZERO_VECTOR = np.zeros(EMBEDDING_DIMENSION, dtype=np.float16)
+_ZERO_VECTOR.flags.writeable = False
+
+
+def _cache_key(text: str) -> str:
+    """Cache key for a normalized text under the configured model."""
+    return f"emb:{EMBEDDING_MODEL}:{xxhash.xxh3_128_hexdigest(text)}"
+
+
+def _redis_get_vectors(keys: List[str]) -> Dict[str, np.ndarray]:
+    """Fetch cached vectors from Redis; errors are treated as misses."""
+    try:
+        values = redis_client.mget(keys)
+    except redis.RedisError as e:
+        logger.warning("embedding_cache_get_failed", error=str(e))
+        return {}
+    
+    found = {}
+    for key, raw in zip(keys, values):
+        if raw is not None and len(raw) == EMBEDDING_DIMENSION * 2:
+            found[key] = np.frombuffer(raw, dtype=np.float16)
+    return found
+
+
+def _redis_set_vectors(vectors: Dict[str, np.ndarray]) -> None:
+    """Store vectors in Redis; errors are logged and ignored."""
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for key, vector in vectors.items():
+            pipeline.set(key, vector.tobytes(), ex=EMBEDDING_CACHE_TTL)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning("embedding_cache_set_failed", error=str(e))
+
+
+def _encode(inputs: List[str]) -> np.ndarray:
+    """Run the embedding model on non-empty texts; one float16 row per text."""
+    if EMBEDDING_PROVIDER == 'sentence-transformers':
+        # encode() sorts inputs by length internally, so each forward
+        # pass pads to similar lengths
+        return model.encode(
+            inputs,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True
+        ).astype(np.float16)
+    
+    import openai
+    response = openai.Embedding.create(
+        input=inputs,
+        model=EMBEDDING_MODEL
+    )
+    data = sorted(response['data'], key=lambda item: item['index'])
+    return np.asarray([item['embedding'] for item in data], dtype=np.float16)
+
+
+def generate_embeddings(texts: List[str]) -> List[np.ndarray]:
+    """
+    Generate embedding vectors for several texts with one model call.
+    
+    Texts are whitespace-normalized and looked up in the in-process LRU,
+    then in Redis; only the remaining texts go through the model. Vectors
+    are float16 (half the size of float32, ample precision for cosine) and
+    shared with the cache, so callers must not modify them in place.
+    
+    Args:
+        texts: Input texts
+    
+    Returns:
+        Embedding vectors, in input order (zero vectors for empty texts or
+        when no model is available)
+    """
+    vectors = [_ZERO_VECTOR] * len(texts)
+    if not model:
+        return vectors
+    
+    # Cache key -> (normalized text, positions in texts)
+    pending: Dict[str, tuple] = {}
+    for i, text in enumerate(texts):
+        normalized = " ".join(text.split()) if text else ""
+        if normalized:
+            key = _cache_key(normalized)
+            pending.setdefault(key, (normalized, []))[1].append(i)
+    if not pending:
+        return vectors
+    
+    found = {}
+    with _memory_cache_lock:
+        for key in pending:
+            vector = _memory_cache.get(key)
+            if vector is not None:
+                found[key] = vector
+    memory_hits = len(found)
+    
+    redis_found = _redis_get_vectors([key for key in pending if key not in found])
+    found.update(redis_found)
+    
+    missing = [key for key in pending if key not in found]
+    computed = {}
+    if missing:
+        try:
+            embeddings = _encode([pending[key][0] for key in missing])
+        except Exception as e:
+            logger.error("embedding_generation_failed", error=str(e), batch_size=len(missing))
+            embeddings = None
+        if embeddings is not None:
+            computed = dict(zip(missing, embeddings))
+            _redis_set_vectors(computed)
+    found.update(computed)
+    
+    with _memory_cache_lock:
+        for key in list(redis_found) + list(computed):
+            _memory_cache[key] = found[key]
+        _cache_stats['lookups'] += len(pending)
+        _cache_stats['memory_hits'] += memory_hits
+        _cache_stats['redis_hits'] += len(redis_found)
+        stats = dict(_cache_stats)
+    
+    logger.info(
+        "embedding_cache_lookup",
+        texts=len(pending),
+        memory_hits=memory_hits,
+        redis_hits=len(redis_found),
+        misses=len(missing),
+        hit_ratio=round((stats['memory_hits'] + stats['redis_hits']) / stats['lookups'], 4)
+    )
+    
+    for key, vector in found.items():
+        for i in pending[key][1]:
+            vectors[i] = vector
+    return vectors
+
+
+def generate_embedding(text: str) -> np.ndarray:
     """
     Generate embedding vector for text.
     
@@ -71,36 +302,153 @@ def generate_embedding(text: str) -> List[float]:
     Returns:
         Embedding vector
     """
-    if not text or not model:
-        # Return zero vector if no model
-        return [0.0] * EMBEDDING_DIMENSION
+    return generate_embeddings([text])[0]
+
+
+async def collect_batch(queue: asyncio.Queue, max_batch: int, max_wait: float) -> list:
+    """
+    Wait for a queue item, then gather more for at most max_wait seconds.
     
-    try:
-        if EMBEDDING_PROVIDER == 'sentence-transformers':
-            embedding = model.encode(text, convert_to_tensor=False)
-            return embedding.tolist()
+    Args:
+        queue: Source queue
+        max_batch: Maximum number of items to return
+        max_wait: Seconds to wait for more items after the first one
+    
+    Returns:
+        Between 1 and max_batch items
+    """
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into batched model calls.
+    
+    Texts are collected until EMBEDDING_MAX_BATCH are pending or the first
+    one has waited EMBEDDING_MAX_WAIT_MS, then encoded together in a worker
+    thread so the event loop keeps serving requests meanwhile.
+    """
+    
+    def __init__(self, max_batch: int, max_wait_ms: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a text as part of the next batch.
         
-        elif EMBEDDING_PROVIDER == 'openai':
-            import openai
-            response = openai.Embedding.create(
-                input=text,
-                model=EMBEDDING_MODEL
-            )
-            return response['data'][0]['embedding']
+        Args:
+            text: Input text
+        
+        Returns:
+            Embedding vector
+        """
+        if self._task is None or self._task.done():
+            # Started lazily: the queue must belong to the running loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
     
-    except Exception as e:
-        logger.error("embedding_generation_failed", error=str(e))
-        return [0.0] * EMBEDDING_DIMENSION
+    async def _run(self):
+        while True:
+            batch = await collect_batch(self._queue, self.max_batch, self.max_wait)
+            
+            try:
+                vectors = await asyncio.to_thread(generate_embeddings, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+embedding_batcher = EmbeddingBatcher(EMBEDDING_MAX_BATCH, EMBEDDING_MAX_WAIT_MS)
+
+
+class QdrantUpsertBatcher:
+    """
+    Buffers points and writes them to Qdrant in batched upserts.
+    
+    Points are collected until QDRANT_UPSERT_BATCH are pending or the first
+    one has waited QDRANT_UPSERT_WAIT_MS, then sent in one upsert call with
+    wait=False, so Qdrant applies them asynchronously.
+    """
+    
+    def __init__(self, max_batch: int, max_wait_ms: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def add(self, point: PointStruct) -> None:
+        """
+        Queue a point for the next upsert batch.
+        
+        Args:
+            point: Point to upsert
+        """
+        if self._task is None or self._task.done():
+            # Started lazily: the queue must belong to the running loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        await self._queue.put(point)
+    
+    async def flush(self) -> None:
+        """Wait until every queued point has been sent to Qdrant."""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def _run(self):
+        while True:
+            batch = await collect_batch(self._queue, self.max_batch, self.max_wait)
+            try:
+                await qdrant_client.upsert(
+                    collection_name=QDRANT_COLLECTION,
+                    points=batch,
+                    wait=False
+                )
+                logger.info("stored_in_qdrant", points=len(batch))
+            except Exception as e:
+                logger.error("qdrant_storage_failed", points=len(batch), error=str(e))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+upsert_batcher = QdrantUpsertBatcher(QDRANT_UPSERT_BATCH, QDRANT_UPSERT_WAIT_MS)
 
 
 async def store_in_qdrant(
     auction_id: str,
-    embedding: List[float],
+    embedding: np.ndarray,
     metadata: Dict[str, Any]
 ) -> Optional[str]:
     """
     Store embedding in Qdrant vector database.
     
+    The point is queued for a batched upsert and the call returns right
+    away; await upsert_batcher.flush() when the write must be sent first.
+    
     Args:
         auction_id: Unique auction identifier
         embedding: Embedding vector
@@ -114,8 +462,8 @@ async def store_in_qdrant(
         return None
     
     try:
-        # Generate deterministic point ID from auction_id
-        point_id = int(hashlib.md5(auction_id.encode()).hexdigest()[:8], 16)
+        # Deterministic 128-bit point ID from auction_id (no practical collisions)
+        point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, auction_id))
         
         # Prepare payload (metadata)
         payload = {
@@ -127,33 +475,23 @@ async def store_in_qdrant(
             'surface_sqm': metadata.get('surface_sqm', 0),
         }
         
-        # Upsert point
-        qdrant_client.upsert(
-            collection_name=QDRANT_COLLECTION,
-            points=[
-                PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload=payload
-                )
-            ]
-        )
-        
-        logger.info(
-            "stored_in_qdrant",
-            auction_id=auction_id,
-            point_id=point_id
+        await upsert_batcher.add(
+            PointStruct(
+                id=point_id,
+                vector=embedding,
+                payload=payload
+            )
         )
         
-        return str(point_id)
+        return point_id
     
     except Exception as e:
         logger.error("qdrant_storage_failed", error=str(e))
         return None
 
 
-def search_similar(
-    query_embedding: List[float],
+async def search_similar(
+    query_embedding: np.ndarray,
     top_k: int = 10,
     score_threshold: float = 0.7
 ) -> List[Dict[str, Any]]:
@@ -172,11 +510,16 @@ def search_similar(
         return []
     
     try:
-        results = qdrant_client.search(
+        results = await qdrant_client.search(
             collection_name=QDRANT_COLLECTION,
             query_vector=query_embedding,
             limit=top_k,
-            score_threshold=score_threshold
+            score_threshold=score_threshold,
+            search_params=SearchParams(
+                hnsw_ef=QDRANT_HNSW_EF,
+                exact=False,
+                quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+            )
         )
         
         return [
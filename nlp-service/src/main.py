@@ -3,29 +3,139 @@ NLP Service main application.
 Handles text normalization, entity extraction, and AI ranking.
 """
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from prometheus_client import CollectorRegistry, Gauge, make_asgi_app, multiprocess
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import logging
 import structlog
 import aiohttp
+import orjson
 import os
+import shutil
+from contextlib import asynccontextmanager
 
-from .normalizer import normalize_auction_text
-from .ner_extractor import extract_entities
-from .ranking_engine import calculate_ai_score
-from .embeddings import generate_embedding, store_in_qdrant
+from .normalizer import preprocess, normalize_batch
+from .ner_extractor import extract_entities, extract_entities_batch, load_spacy_model
+from .ranking_engine import calculate_ai_score, calculate_ai_scores
+from .embeddings import (
+    generate_embeddings,
+    embedding_batcher,
+    upsert_batcher,
+    store_in_qdrant,
+    collect_batch,
+    ensure_qdrant_collection,
+    load_embedding_model,
+    qdrant_client,
+)
+
+# Drop events below LOG_LEVEL before any processor runs, so the per-record
+# debug events in the NLP steps cost a no-op call in production
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(LOG_LEVEL.upper())),
+    cache_logger_on_first_use=True
+)
 
 logger = structlog.get_logger()
 BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Background saves to the backend
+BACKEND_SAVE_QUEUE_SIZE = int(os.getenv("BACKEND_SAVE_QUEUE_SIZE", "1000"))
+BACKEND_SAVE_WORKERS = int(os.getenv("BACKEND_SAVE_WORKERS", "4"))
+BACKEND_SAVE_BATCH = int(os.getenv("BACKEND_SAVE_BATCH", "100"))
+BACKEND_SAVE_WAIT_MS = int(os.getenv("BACKEND_SAVE_WAIT_MS", "50"))
+BACKEND_SAVE_DRAIN_TIMEOUT = float(os.getenv("BACKEND_SAVE_DRAIN_TIMEOUT", "10"))  # seconds
+BACKEND_SAVE_RETRY_DELAY = float(os.getenv("BACKEND_SAVE_RETRY_DELAY", "1"))  # seconds, doubled per failure
+BACKEND_SAVE_MAX_RETRY_DELAY = float(os.getenv("BACKEND_SAVE_MAX_RETRY_DELAY", "60"))  # seconds
+# Bulk responses meaning a row in the batch is invalid
+BAD_BATCH_STATUSES = (400, 422)
+
+# Each worker process keeps its own metrics. With PROMETHEUS_MULTIPROC_DIR
+# set (as in the Docker image) they are written there and /metrics sums
+# them across workers
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+backend_save_queue_depth = Gauge(
+    "nlp_backend_save_queue_depth",
+    "Processed auctions waiting to be saved to the backend",
+    multiprocess_mode="livesum"
+)
+
+
+def metrics_app():
+    """ASGI app serving /metrics for this process, or for all workers in multiprocess mode."""
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return make_asgi_app()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return make_asgi_app(registry=registry)
+
+
+def update_queue_depth(queue: asyncio.Queue):
+    """Publish the save queue length (a callback gauge cannot be shared across workers)."""
+    backend_save_queue_depth.set(queue.qsize())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan handler."""
+    # Model loads (CPU/GPU bound) overlap each other and the Qdrant
+    # collection check
+    await asyncio.gather(
+        asyncio.to_thread(load_embedding_model),
+        asyncio.to_thread(load_spacy_model),
+        ensure_qdrant_collection()
+    )
+    
+    # One keep-alive connection pool to the backend for all requests
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30)
+    )
+    app.state.save_queue = asyncio.Queue(maxsize=BACKEND_SAVE_QUEUE_SIZE)
+    save_workers = [
+        asyncio.create_task(backend_save_worker(app.state.save_queue))
+        for _ in range(BACKEND_SAVE_WORKERS)
+    ]
+    
+    yield
+    
+    # Give queued saves a chance to reach the backend before shutting down
+    try:
+        await asyncio.wait_for(app.state.save_queue.join(), BACKEND_SAVE_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("backend_save_queue_not_drained", pending=app.state.save_queue.qsize())
+    for worker in save_workers:
+        worker.cancel()
+    await asyncio.gather(*save_workers, return_exceptions=True)
+    await app.state.http.close()
+    await upsert_batcher.flush()
+    if qdrant_client:
+        await qdrant_client.close()
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
 
 app = FastAPI(
     title="AI Real Estate NLP Service",
     description="NLP processing for auction data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Mount Prometheus metrics
+app.mount("/metrics", metrics_app())
+
 
 class AuctionInput(BaseModel):
     """Input schema for auction processing."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     external_id: str
     title: str
     description: Optional[str] = None
@@ -37,6 +147,8 @@ class AuctionInput(BaseModel):
 
 class ProcessedAuction(BaseModel):
     """Output schema for processed auction."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     external_id: str
     normalized_data: Dict[str, Any]
     extracted_entities: Dict[str, Any]
@@ -55,67 +167,241 @@ async def health_check():
     }
 
 
-async def save_to_backend(auction_data: Dict[str, Any], ai_score: float, score_breakdown: Dict[str, float], embedding_id: Optional[str]):
-    """Save processed auction to backend database."""
+def build_backend_payload(
+    auction_data: Dict[str, Any],
+    ai_score: float,
+    score_breakdown: Dict[str, float],
+    embedding_id: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Build the backend auction payload for a processed auction.
+    
+    Args:
+        auction_data: Normalized auction data
+        ai_score: AI ranking score
+        score_breakdown: Per-factor score breakdown
+        embedding_id: Qdrant point ID, if stored
+    
+    Returns:
+        Payload for POST /api/v1/auctions/scraper(/bulk)
+    """
+    # Convert auction_round to int or None
+    auction_round = auction_data.get("auction_round")
+    if auction_round is not None:
+        try:
+            auction_round = int(auction_round) if auction_round != "" else None
+        except (ValueError, TypeError):
+            auction_round = None
+    
+    backend_data = {
+        "external_id": auction_data.get("external_id"),
+        "title": auction_data.get("title", ""),
+        "description": auction_data.get("description", ""),
+        "property_type": auction_data.get("property_type", "UNKNOWN"),
+        "city": auction_data.get("city", ""),
+        "province": auction_data.get("province", ""),
+        "address": auction_data.get("address", ""),
+        "base_price": auction_data.get("base_price"),
+        "auction_date": auction_data.get("auction_date"),
+        "auction_round": auction_round,
+        "court": auction_data.get("court", ""),
+        "status": "ACTIVE",
+        "ai_score": ai_score,
+        "score_breakdown": score_breakdown,
+        "source_url": auction_data.get("url", ""),
+        "raw_data": auction_data.get("raw_data", {}),
+        "embedding_id": embedding_id
+    }
+    
+    # Add coordinates if available
+    if auction_data.get("latitude") and auction_data.get("longitude"):
+        backend_data["latitude"] = auction_data["latitude"]
+        backend_data["longitude"] = auction_data["longitude"]
+    
+    return backend_data
+
+
+async def save_to_backend(backend_data: Dict[str, Any]) -> bool:
+    """Save one processed auction to the backend database."""
     try:
-        # Prepare data for backend API
-        # Convert auction_round to int or None
-        auction_round = auction_data.get("auction_round")
-        if auction_round is not None:
-            try:
-                auction_round = int(auction_round) if auction_round != "" else None
-            except (ValueError, TypeError):
-                auction_round = None
-        
-        backend_data = {
-            "external_id": auction_data.get("external_id"),
-            "title": auction_data.get("title", ""),
-            "description": auction_data.get("description", ""),
-            "property_type": auction_data.get("property_type", "UNKNOWN"),
-            "city": auction_data.get("city", ""),
-            "province": auction_data.get("province", ""),
-            "address": auction_data.get("address", ""),
-            "base_price": auction_data.get("base_price"),
-            "auction_date": auction_data.get("auction_date"),
-            "auction_round": auction_round,
-            "court": auction_data.get("court", ""),
-            "status": "ACTIVE",
-            "ai_score": ai_score,
-            "score_breakdown": score_breakdown,
-            "source_url": auction_data.get("url", ""),
-            "raw_data": auction_data.get("raw_data", {}),
-            "embedding_id": embedding_id
-        }
-        
-        # Add coordinates if available
-        if auction_data.get("latitude") and auction_data.get("longitude"):
-            backend_data["latitude"] = auction_data["latitude"]
-            backend_data["longitude"] = auction_data["longitude"]
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{BACKEND_URL}/api/v1/auctions/scraper",
-                json=backend_data,
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status in [200, 201]:
-                    logger.info("saved_to_backend", auction_id=auction_data.get("external_id"))
-                    return True
-                else:
-                    error_text = await response.text()
-                    logger.error("backend_save_failed", 
-                               status=response.status, 
-                               auction_id=auction_data.get("external_id"),
-                               error=error_text)
-                    return False
+        async with app.state.http.post(
+            f"{BACKEND_URL}/api/v1/auctions/scraper",
+            data=orjson.dumps(backend_data),
+            headers=JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status in [200, 201]:
+                logger.info("saved_to_backend", auction_id=backend_data.get("external_id"))
+                return True
+            else:
+                error_text = await response.text()
+                logger.error("backend_save_failed", 
+                           status=response.status, 
+                           auction_id=backend_data.get("external_id"),
+                           error=error_text)
+                return False
     except Exception as e:
         logger.error("backend_save_error", 
-                    auction_id=auction_data.get("external_id"), 
+                    auction_id=backend_data.get("external_id"), 
                     error=str(e))
         return False
 
 
-@app.post("/process", response_model=ProcessedAuction)
+async def save_batch_to_backend(batch: List[Dict[str, Any]]) -> Optional[int]:
+    """
+    Save several processed auctions to the backend in one request.
+    
+    Returns:
+        HTTP status of the response, or None if the backend was unreachable
+    """
+    try:
+        async with app.state.http.post(
+            f"{BACKEND_URL}/api/v1/auctions/scraper/bulk",
+            data=orjson.dumps(batch),
+            headers=JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status == 200:
+                logger.info("saved_batch_to_backend", count=len(batch))
+            else:
+                error_text = await response.text()
+                logger.error("backend_batch_save_failed",
+                             status=response.status,
+                             count=len(batch),
+                             error=error_text)
+            return response.status
+    except Exception as e:
+        logger.error("backend_batch_save_error", count=len(batch), error=str(e))
+        return None
+
+
+def requeue_backend_saves(queue: asyncio.Queue, batch: List[Dict[str, Any]]):
+    """Put a failed batch back on the save queue, dropping what does not fit."""
+    for position, backend_data in enumerate(batch):
+        try:
+            queue.put_nowait(backend_data)
+        except asyncio.QueueFull:
+            logger.error(
+                "backend_saves_dropped",
+                count=len(batch) - position,
+                auction_ids=[item.get("external_id") for item in batch[position:]]
+            )
+            break
+    update_queue_depth(queue)
+
+
+async def backend_save_worker(queue: asyncio.Queue):
+    """
+    Drain the save queue, posting auctions to the backend in batches.
+    
+    A batch is merged in one backend transaction, so a single bad row
+    fails all of it (400/422); the batch is then retried one auction at a
+    time. Any other failure (unreachable, 5xx) would fail each row too, so
+    the batch is requeued and the worker backs off, doubling the delay on
+    each consecutive failure.
+    
+    Args:
+        queue: Queue of backend payloads
+    """
+    failures = 0
+    while True:
+        batch = await collect_batch(queue, BACKEND_SAVE_BATCH, BACKEND_SAVE_WAIT_MS / 1000)
+        update_queue_depth(queue)
+        try:
+            status = await save_batch_to_backend(batch)
+            if status == 200:
+                failures = 0
+            elif status in BAD_BATCH_STATUSES:
+                failures = 0
+                for backend_data in batch:
+                    await save_to_backend(backend_data)
+            else:
+                failures += 1
+                requeue_backend_saves(queue, batch)
+                delay = min(BACKEND_SAVE_MAX_RETRY_DELAY, BACKEND_SAVE_RETRY_DELAY * 2 ** (failures - 1))
+                logger.warning("backend_save_backing_off", status=status, delay_seconds=delay)
+                await asyncio.sleep(delay)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def queue_backend_save(backend_data: Dict[str, Any]):
+    """
+    Queue a processed auction for a background backend save.
+    
+    When the queue is full the auction is saved inline instead, which
+    slows the caller down rather than dropping the write.
+    
+    Args:
+        backend_data: Backend auction payload
+    """
+    try:
+        app.state.save_queue.put_nowait(backend_data)
+        update_queue_depth(app.state.save_queue)
+    except asyncio.QueueFull:
+        logger.warning("backend_save_queue_full", auction_id=backend_data.get("external_id"))
+        await save_to_backend(backend_data)
+
+
+def analyze_auctions(auctions: List[AuctionInput]) -> List[Tuple[Dict[str, Any], Dict[str, Any], float, Dict[str, float]]]:
+    """
+    Run the CPU-side NLP steps for several auctions.
+    
+    Args:
+        auctions: Auction inputs
+    
+    Returns:
+        Tuples of (normalized data, extracted entities, AI score, score
+        breakdown), in input order
+    """
+    # Clean, join and lowercase the text once for all steps
+    docs = [
+        preprocess(auction.title, auction.description or "", auction.full_text or "")
+        for auction in auctions
+    ]
+    
+    # Extract entities (spaCy runs over the whole batch)
+    all_entities = extract_entities_batch(docs)
+    
+    # Normalize text
+    all_normalized = normalize_batch([auction.model_dump() for auction in auctions], docs)
+    
+    # Merge extracted entities with input
+    for normalized, entities in zip(all_normalized, all_entities):
+        normalized.update(entities)
+    
+    # Calculate AI scores
+    scores = calculate_ai_scores(all_normalized)
+    
+    results = [
+        (normalized, entities, ai_score, score_breakdown)
+        for normalized, entities, (ai_score, score_breakdown)
+        in zip(all_normalized, all_entities, scores)
+    ]
+    
+    return results
+
+
+def analyze_auction(auction: AuctionInput) -> Tuple[Dict[str, Any], Dict[str, Any], float, Dict[str, float]]:
+    """
+    Run the CPU-side NLP steps for an auction.
+    
+    Args:
+        auction: Auction input
+    
+    Returns:
+        Tuple of (normalized data, extracted entities, AI score, score breakdown)
+    """
+    return analyze_auctions([auction])[0]
+
+
+def embedding_text(normalized: Dict[str, Any]) -> str:
+    """Text embedded for similarity search, from the cleaned title and description."""
+    return f"{normalized.get('title') or ''} {normalized.get('description') or ''}"
+
+
+@app.post("/process", response_model=ProcessedAuction, response_model_exclude_none=True)
 async def process_auction(auction: AuctionInput):
     """
     Process auction data through NLP pipeline.
@@ -124,35 +410,21 @@ async def process_auction(auction: AuctionInput):
     1. Normalize text
     2. Extract entities (NER)
     3. Calculate AI ranking score
-    4. Generate embeddings
+    4. Generate embeddings (batched with concurrent requests)
     5. Store in vector database
-    6. Save to backend database
+    6. Queue save to backend database
     """
     try:
         logger.info("processing_auction", auction_id=auction.external_id)
         
-        # Step 1: Normalize text
-        normalized = normalize_auction_text(auction.dict())
-        
-        # Step 2: Extract entities
-        entities = extract_entities(
-            title=auction.title,
-            description=auction.description or "",
-            full_text=auction.full_text or ""
-        )
-        
-        # Merge extracted entities with input
-        normalized.update(entities)
-        
-        # Step 3: Calculate AI score
-        ai_score, score_breakdown = calculate_ai_score(normalized)
+        # Steps 1-3: Normalize, extract entities, score
+        normalized, entities, ai_score, score_breakdown = await asyncio.to_thread(analyze_auction, auction)
         
         # Step 4: Generate embeddings and store
-        embedding_text = f"{auction.title} {auction.description or ''}"
         embedding_id = None
         
         try:
-            embedding = generate_embedding(embedding_text)
+            embedding = await embedding_batcher.embed(embedding_text(normalized))
             embedding_id = await store_in_qdrant(
                 auction.external_id,
                 embedding,
@@ -161,8 +433,10 @@ async def process_auction(auction: AuctionInput):
         except Exception as e:
             logger.warning("embedding_failed", error=str(e))
         
-        # Step 5: Save to backend database
-        await save_to_backend(normalized, ai_score, score_breakdown, embedding_id)
+        # Step 5: Save to backend database (in the background)
+        await queue_backend_save(
+            build_backend_payload(normalized, ai_score, score_breakdown, embedding_id)
+        )
         
         logger.info(
             "auction_processed",
@@ -188,6 +462,61 @@ async def process_auction(auction: AuctionInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/process-batch", response_model=List[ProcessedAuction])
+async def process_auctions_batch(auctions: List[AuctionInput]):
+    """
+    Process several auctions through the NLP pipeline.
+    
+    Same steps as /process, but all embeddings are generated with a single
+    model call.
+    """
+    try:
+        logger.info("processing_auction_batch", count=len(auctions))
+        
+        # spaCy and the regex normalization run off the event loop
+        analyzed = await asyncio.to_thread(analyze_auctions, auctions)
+        
+        try:
+            embeddings = await asyncio.to_thread(
+                generate_embeddings, [embedding_text(normalized) for normalized, *_ in analyzed]
+            )
+        except Exception as e:
+            logger.warning("embedding_failed", error=str(e))
+            embeddings = [None] * len(auctions)
+        
+        results = []
+        for auction, (normalized, entities, ai_score, score_breakdown), embedding in zip(
+            auctions, analyzed, embeddings
+        ):
+            embedding_id = None
+            if embedding is not None:
+                try:
+                    embedding_id = await store_in_qdrant(auction.external_id, embedding, normalized)
+                except Exception as e:
+                    logger.warning("embedding_failed", error=str(e))
+            
+            await queue_backend_save(
+                build_backend_payload(normalized, ai_score, score_breakdown, embedding_id)
+            )
+            
+            results.append(ProcessedAuction(
+                external_id=auction.external_id,
+                normalized_data=normalized,
+                extracted_entities=entities,
+                ai_score=ai_score,
+                score_breakdown=score_breakdown,
+                embedding_id=embedding_id
+            ))
+        
+        logger.info("auction_batch_processed", count=len(results))
+        
+        return results
+    
+    except Exception as e:
+        logger.error("batch_processing_failed", count=len(auctions), error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/extract-entities")
 async def extract_entities_endpoint(text: str):
     """Extract entities from raw text."""
@@ -213,4 +542,18 @@ async def calculate_score_endpoint(data: Dict[str, Any]):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # Start from an empty metrics directory: files left by earlier runs
+    # would be summed into the new workers' values
+    if PROMETHEUS_MULTIPROC_DIR:
+        shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(PROMETHEUS_MULTIPROC_DIR)
+    # Each worker process loads its own model copy: keep NLP_WORKERS
+    # within the cores (or GPU slots) available
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8001,
+        workers=int(os.getenv("NLP_WORKERS", "2")),
+        loop="uvloop",
+        http="httptools"
+    )
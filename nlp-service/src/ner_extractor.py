@@ -3,20 +3,58 @@ Named Entity Recognition (NER) for Italian real estate text.
 Extracts: property type, city, price, surface, court, dates.
 """
 import re
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import structlog
 
+from .normalizer import Preprocessed, preprocess
+
 logger = structlog.get_logger()
 
-# Try to import spaCy, fallback to regex-only if not available
-try:
-    import spacy
-    nlp = spacy.load("it_core_news_lg")
-    SPACY_AVAILABLE = True
-except:
-    SPACY_AVAILABLE = False
-    logger.warning("spacy_not_available", message="Using regex-only extraction")
+# Only the entity recognizer is used (it has its own embedding layer);
+# excluded components are never loaded
+SPACY_EXCLUDE = ["tok2vec", "morphologizer", "tagger", "parser", "lemmatizer", "attribute_ruler"]
+SPACY_BATCH_SIZE = 64
+
+SPACY_MODEL = "it_core_news_lg"
+
+# Loaded by load_spacy_model(), from the app lifespan or on first use;
+# regex-only extraction if spaCy or the model is not available
+nlp = None
+SPACY_AVAILABLE = False
+_spacy_loaded = False
+_spacy_lock = threading.Lock()
+
+
+def load_spacy_model() -> None:
+    """
+    Load the spaCy pipeline once.
+    
+    Runs from the app lifespan in a thread (the model takes seconds and
+    hundreds of MB to load), so importing this module stays cheap. Safe
+    to call from several threads; later calls return immediately.
+    """
+    global nlp, SPACY_AVAILABLE, _spacy_loaded
+    
+    with _spacy_lock:
+        if _spacy_loaded:
+            return
+        try:
+            import spacy
+            nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            SPACY_AVAILABLE = True
+            logger.info("loaded_spacy_model", model=SPACY_MODEL)
+        except Exception:
+            logger.warning("spacy_not_available", message="Using regex-only extraction")
+        _spacy_loaded = True
+
+
+def get_nlp():
+    """The spaCy pipeline, loaded on first use, or None if not available."""
+    if not _spacy_loaded:
+        load_spacy_model()
+    return nlp
 
 
 PROPERTY_TYPES = {
@@ -46,52 +84,85 @@ PROPERTY_TYPES = {
     'casale': 'Rustico',
 }
 
+# Whole-word patterns, so 'lotto' does not match inside 'salotto' or
+# 'casa' inside 'casale'; checked in PROPERTY_TYPES (priority) order
+PROPERTY_TYPE_PATTERNS = [
+    (keyword, re.compile(r'\b' + re.escape(keyword) + r'\b'), prop_type)
+    for keyword, prop_type in PROPERTY_TYPES.items()
+]
+
 ITALIAN_CITIES = [
     'Roma', 'Milano', 'Napoli', 'Torino', 'Palermo', 'Genova', 'Bologna',
     'Firenze', 'Bari', 'Catania', 'Venezia', 'Verona', 'Messina', 'Padova',
     'Trieste', 'Brescia', 'Parma', 'Taranto', 'Prato', 'Modena', 'Reggio Calabria',
 ]
+ITALIAN_CITIES_SET = frozenset(ITALIAN_CITIES)
+ITALIAN_CITIES_LOWER = [(city.lower(), city) for city in ITALIAN_CITIES]
 
 
-def extract_property_type(text: str) -> Optional[str]:
-    """Extract property type from text."""
-    text_lower = text.lower()
+def extract_property_type(text: str, text_lower: Optional[str] = None) -> Optional[str]:
+    """Extract property type from text (text_lower: text.lower(), if already computed)."""
+    if text_lower is None:
+        text_lower = text.lower()
     
-    for keyword, prop_type in PROPERTY_TYPES.items():
-        if keyword in text_lower:
+    for keyword, pattern, prop_type in PROPERTY_TYPE_PATTERNS:
+        # Cheap substring test first; the regex only confirms a hit
+        if keyword in text_lower and pattern.search(text_lower):
             return prop_type
     
     return "Altro"
 
 
-def extract_city(text: str) -> Optional[str]:
-    """Extract city name from text."""
-    if SPACY_AVAILABLE:
-        doc = nlp(text)
+def mentioned_cities(text_lower: str) -> List[str]:
+    """Known cities whose name occurs in the lowercased text, in ITALIAN_CITIES order."""
+    return [city for city_lower, city in ITALIAN_CITIES_LOWER if city_lower in text_lower]
+
+
+def extract_city(text: str, text_lower: Optional[str] = None, spacy_doc=None) -> Optional[str]:
+    """
+    Extract city name from text.
+    
+    text_lower (text.lower()) and spacy_doc (nlp(text)) can be passed in
+    when already computed.
+    """
+    if text_lower is None:
+        text_lower = text.lower()
+    cities = mentioned_cities(text_lower)
+    
+    # spaCy only returns known cities, which must occur in the text, so it
+    # is needed only to pick the location among several mentioned cities
+    if len(cities) > 1 and (spacy_doc is not None or get_nlp() is not None):
+        doc = spacy_doc if spacy_doc is not None else nlp(text)
         for ent in doc.ents:
             if ent.label_ == "LOC" or ent.label_ == "GPE":
                 # Check if it's a known Italian city
-                if ent.text in ITALIAN_CITIES:
+                if ent.text in ITALIAN_CITIES_SET:
                     return ent.text
     
-    # Fallback: check for known cities in text
-    for city in ITALIAN_CITIES:
-        if city.lower() in text.lower():
-            return city
-    
-    return None
+    # Fallback: first known city in text
+    return cities[0] if cities else None
+
+
+# Each pattern with the lowercase literals one of which any match contains.
+# A regex without a literal prefix is tried at every position of the text,
+# so it only runs when a plain substring test finds one of its literals.
+PRICE_PATTERNS = [
+    (('prezzo base', 'base d', 'valore'),
+     re.compile(r'(?:prezzo base|base d\'?asta|valore).*?€?\s*([\d.,]+)', re.IGNORECASE)),
+    (('€',), re.compile(r'€\s*([\d.,]+)', re.IGNORECASE)),
+    (('€',), re.compile(r'([\d]{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)\s*€', re.IGNORECASE)),
+]
 
 
-def extract_price(text: str) -> Optional[float]:
-    """Extract price from text."""
-    patterns = [
-        r'(?:prezzo base|base d\'?asta|valore).*?€?\s*([\d.,]+)',
-        r'€\s*([\d.,]+)',
-        r'([\d]{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)\s*€',
-    ]
+def extract_price(text: str, text_lower: Optional[str] = None) -> Optional[float]:
+    """Extract price from text (text_lower: text.lower(), if already computed)."""
+    if text_lower is None:
+        text_lower = text.lower()
     
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for literals, pattern in PRICE_PATTERNS:
+        if not any(literal in text_lower for literal in literals):
+            continue
+        match = pattern.search(text)
         if match:
             try:
                 price_str = match.group(1)
@@ -107,15 +178,23 @@ def extract_price(text: str) -> Optional[float]:
     return None
 
 
-def extract_surface(text: str) -> Optional[float]:
-    """Extract surface area in square meters."""
-    patterns = [
-        r'(\d+)\s*(?:mq|m2|m²|metri quadri)',
-        r'superficie.*?(\d+)',
-    ]
+# Same (literals, pattern) layout as PRICE_PATTERNS
+SURFACE_PATTERNS = [
+    (('mq', 'm2', 'm²', 'metri quadri'),
+     re.compile(r'(\d+)\s*(?:mq|m2|m²|metri quadri)', re.IGNORECASE)),
+    (('superficie',), re.compile(r'superficie.*?(\d+)', re.IGNORECASE)),
+]
+
+
+def extract_surface(text: str, text_lower: Optional[str] = None) -> Optional[float]:
+    """Extract surface area in square meters (text_lower: text.lower(), if already computed)."""
+    if text_lower is None:
+        text_lower = text.lower()
     
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for literals, pattern in SURFACE_PATTERNS:
+        if not any(literal in text_lower for literal in literals):
+            continue
+        match = pattern.search(text)
         if match:
             try:
                 surface = float(match.group(1))
@@ -127,8 +206,12 @@ def extract_surface(text: str) -> Optional[float]:
     return None
 
 
-def extract_rooms(text: str) -> Optional[int]:
-    """Extract number of rooms."""
+ROOMS_PATTERN = re.compile(r'(\d+)\s*(?:vani|locali|camere)', re.IGNORECASE)
+ROOMS_LITERALS = ('vani', 'locali', 'camere')
+
+
+def extract_rooms(text: str, text_lower: Optional[str] = None) -> Optional[int]:
+    """Extract number of rooms (text_lower: text.lower(), if already computed)."""
     mappings = {
         'monolocale': 1,
         'bilocale': 2,
@@ -136,12 +219,16 @@ def extract_rooms(text: str) -> Optional[int]:
         'quadrilocale': 4,
     }
     
-    text_lower = text.lower()
+    if text_lower is None:
+        text_lower = text.lower()
     for term, count in mappings.items():
         if term in text_lower:
             return count
     
-    match = re.search(r'(\d+)\s*(?:vani|locali|camere)', text, re.IGNORECASE)
+    if not any(literal in text_lower for literal in ROOMS_LITERALS):
+        return None
+    
+    match = ROOMS_PATTERN.search(text)
     if match:
         try:
             rooms = int(match.group(1))
@@ -153,30 +240,39 @@ def extract_rooms(text: str) -> Optional[int]:
     return None
 
 
+COURT_PATTERNS = [
+    re.compile(r'Tribunale\s+(?:di\s+)?([A-Z][a-zà-ù]+)'),
+    re.compile(r'Tribunale\s+([A-Z][a-zà-ù]+)'),
+]
+
+
 def extract_court(text: str) -> Optional[str]:
     """Extract court/tribunal name."""
-    patterns = [
-        r'Tribunale\s+(?:di\s+)?([A-Z][a-zà-ù]+)',
-        r'Tribunale\s+([A-Z][a-zà-ù]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in COURT_PATTERNS:
+        match = pattern.search(text)
         if match:
             return f"Tribunale di {match.group(1)}"
     
     return None
 
 
+MONTHS = {
+    'gennaio': 1, 'febbraio': 2, 'marzo': 3, 'aprile': 4,
+    'maggio': 5, 'giugno': 6, 'luglio': 7, 'agosto': 8,
+    'settembre': 9, 'ottobre': 10, 'novembre': 11, 'dicembre': 12
+}
+
+# Tried in order: a numeric date anywhere takes precedence over a written one
+DATE_PATTERNS = [
+    re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', re.IGNORECASE),
+    re.compile(r'(\d{1,2})\s+(' + '|'.join(MONTHS) + r')\s+(\d{4})', re.IGNORECASE),
+]
+
+
 def extract_auction_date(text: str) -> Optional[str]:
     """Extract auction date."""
-    patterns = [
-        r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})',
-        r'(\d{1,2})\s+(gennaio|febbraio|marzo|aprile|maggio|giugno|luglio|agosto|settembre|ottobre|novembre|dicembre)\s+(\d{4})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(text)
         if match:
             try:
                 if len(match.groups()) == 3:
@@ -186,13 +282,8 @@ def extract_auction_date(text: str) -> Optional[str]:
                         date_obj = datetime(int(year), int(month), int(day))
                     else:
                         # DD Month YYYY format
-                        months = {
-                            'gennaio': 1, 'febbraio': 2, 'marzo': 3, 'aprile': 4,
-                            'maggio': 5, 'giugno': 6, 'luglio': 7, 'agosto': 8,
-                            'settembre': 9, 'ottobre': 10, 'novembre': 11, 'dicembre': 12
-                        }
                         day = int(match.group(1))
-                        month = months.get(match.group(2).lower(), 1)
+                        month = MONTHS.get(match.group(2).lower(), 1)
                         year = int(match.group(3))
                         date_obj = datetime(year, month, day)
                     
@@ -215,32 +306,91 @@ def extract_entities(title: str, description: str, full_text: str) -> Dict[str,
     Returns:
         Dictionary of extracted entities
     """
-    combined_text = f"{title} {description} {full_text}"
+    return extract_entities_from(preprocess(title, description, full_text))
+
+
+def extract_entities_batch(docs: List[Preprocessed]) -> List[Dict[str, Any]]:
+    """
+    Extract entities from several auctions, running spaCy (where needed)
+    over them in batches with nlp.pipe and logging once for the batch.
+    
+    Args:
+        docs: Preprocessed auction texts
+    
+    Returns:
+        Dictionaries of extracted entities, in input order
+    """
+    spacy_docs = {}
+    if get_nlp() is not None:
+        # Parse only the texts where extract_city needs spaCy
+        ambiguous = [doc for doc in docs if len(mentioned_cities(doc.lowered)) > 1]
+        spacy_docs = dict(zip(
+            map(id, ambiguous),
+            nlp.pipe((doc.text for doc in ambiguous), batch_size=SPACY_BATCH_SIZE)
+        ))
+    results = [_extract(doc, spacy_docs.get(id(doc))) for doc in docs]
+    
+    logger.debug(
+        "entities_batch_extracted",
+        count=len(results),
+        with_price=sum('base_price' in entities for entities in results),
+        with_city=sum('city' in entities for entities in results)
+    )
+    
+    return results
+
+
+def extract_entities_from(doc: Preprocessed, spacy_doc=None) -> Dict[str, Any]:
+    """
+    Extract all entities from preprocessed auction text.
+    
+    Args:
+        doc: Preprocessed auction text
+        spacy_doc: spaCy parse of doc.text, if already computed
+    
+    Returns:
+        Dictionary of extracted entities
+    """
+    entities = _extract(doc, spacy_doc)
+    
+    logger.debug(
+        "entities_extracted",
+        entities_count=len(entities),
+        has_price='base_price' in entities,
+        has_city='city' in entities
+    )
+    
+    return entities
+
+
+def _extract(doc: Preprocessed, spacy_doc=None) -> Dict[str, Any]:
+    """Entities of one auction, without logging."""
+    combined_text = doc.text
     
     entities = {}
     
     # Extract property type
-    prop_type = extract_property_type(combined_text)
+    prop_type = extract_property_type(combined_text, doc.lowered)
     if prop_type:
         entities['property_type'] = prop_type
     
     # Extract city
-    city = extract_city(combined_text)
+    city = extract_city(combined_text, doc.lowered, spacy_doc)
     if city:
         entities['city'] = city
     
     # Extract price
-    price = extract_price(combined_text)
+    price = extract_price(combined_text, doc.lowered)
     if price:
         entities['base_price'] = price
     
     # Extract surface
-    surface = extract_surface(combined_text)
+    surface = extract_surface(combined_text, doc.lowered)
     if surface:
         entities['surface_sqm'] = surface
     
     # Extract rooms
-    rooms = extract_rooms(combined_text)
+    rooms = extract_rooms(combined_text, doc.lowered)
     if rooms:
         entities['rooms'] = rooms
     
@@ -254,11 +404,4 @@ def extract_entities(title: str, description: str, full_text: str) -> Dict[str,
     if auction_date:
         entities['auction_date'] = auction_date
     
-    logger.debug(
-        "entities_extracted",
-        entities_count=len(entities),
-        has_price=bool(price),
-        has_city=bool(city)
-    )
-    
     return entities
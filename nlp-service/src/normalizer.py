@@ -3,11 +3,24 @@ Text normalization utilities.
 Cleans and standardizes auction text data.
 """
 import re
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, List
 import structlog
 
 logger = structlog.get_logger()
 
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Special characters, keeping Italian accents
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s€.,;:()\-àèéìòù]', re.UNICODE)
+PRICE_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d{1,2})?)')
+# Surface patterns like "80 mq", "80m2", "80 metri quadri"
+SURFACE_PATTERNS = [
+    re.compile(r'(\d+)\s*(?:mq|m2|m²)', re.IGNORECASE),
+    re.compile(r'(\d+)\s*metri\s*quadr[ia]', re.IGNORECASE),
+    re.compile(r'superficie.*?(\d+)', re.IGNORECASE),
+]
+ROOMS_PATTERN = re.compile(r'(\d+)\s*(?:vani|locali|stanze|camere)', re.IGNORECASE)
+
 
 def clean_text(text: str) -> str:
     """Remove extra whitespace and normalize text."""
@@ -15,14 +28,57 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     
     # Remove special characters but keep Italian accents
-    text = re.sub(r'[^\w\s€.,;:()\-àèéìòù]', '', text, flags=re.UNICODE)
+    text = SPECIAL_CHARS_PATTERN.sub('', text)
     
     return text.strip()
 
 
+@dataclass(frozen=True)
+class Preprocessed:
+    """
+    Auction text prepared once and shared by normalization, entity
+    extraction and the embedding text.
+    
+    Attributes:
+        title: Cleaned title
+        description: Cleaned description
+        full_text: Cleaned full text
+        text: Raw title, description and full text joined (entity patterns
+            need the characters clean_text removes)
+        lowered: Lowercased text, for keyword lookups
+    """
+    title: str
+    description: str
+    full_text: str
+    text: str
+    lowered: str
+
+
+def preprocess(title: str, description: str = "", full_text: str = "") -> Preprocessed:
+    """
+    Clean, join and lowercase the auction text fields in one pass.
+    
+    Args:
+        title: Auction title
+        description: Auction description
+        full_text: Full auction text
+    
+    Returns:
+        Preprocessed text
+    """
+    text = f"{title} {description} {full_text}"
+    return Preprocessed(
+        title=clean_text(title),
+        description=clean_text(description),
+        full_text=clean_text(full_text),
+        text=text,
+        lowered=text.lower()
+    )
+
+
 def normalize_price(price_text: str) -> float:
     """Extract and normalize price from text."""
     if not price_text:
@@ -35,7 +91,7 @@ def normalize_price(price_text: str) -> float:
     price_text = price_text.replace('.', '').replace(',', '.')
     
     # Extract number
-    match = re.search(r'(\d+(?:\.\d{1,2})?)', price_text)
+    match = PRICE_NUMBER_PATTERN.search(price_text)
     if match:
         try:
             return float(match.group(1))
@@ -50,15 +106,8 @@ def normalize_surface(text: str) -> float:
     if not text:
         return 0.0
     
-    # Look for patterns like "80 mq", "80m2", "80 metri quadri"
-    patterns = [
-        r'(\d+)\s*(?:mq|m2|m²)',
-        r'(\d+)\s*metri\s*quadr[ia]',
-        r'superficie.*?(\d+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in SURFACE_PATTERNS:
+        match = pattern.search(text)
         if match:
             try:
                 return float(match.group(1))
@@ -87,7 +136,7 @@ def normalize_rooms(text: str) -> int:
             return count
     
     # Look for number + rooms/vani
-    match = re.search(r'(\d+)\s*(?:vani|locali|stanze|camere)', text, re.IGNORECASE)
+    match = ROOMS_PATTERN.search(text)
     if match:
         try:
             return int(match.group(1))
@@ -107,17 +156,59 @@ def normalize_auction_text(data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Normalized data dictionary
     """
+    doc = preprocess(
+        data.get('title') or "",
+        data.get('description') or "",
+        data.get('full_text') or ""
+    )
+    return normalize_preprocessed(data, doc)
+
+
+def normalize_preprocessed(data: Dict[str, Any], doc: Preprocessed) -> Dict[str, Any]:
+    """
+    Normalize auction data using text that was already preprocessed.
+    
+    Args:
+        data: Raw auction data dictionary
+        doc: Preprocessed text of the same auction
+    
+    Returns:
+        Normalized data dictionary
+    """
+    normalized = _normalize(data, doc)
+    logger.debug("text_normalized", auction_id=normalized.get('external_id'))
+    return normalized
+
+
+def normalize_batch(records: List[Dict[str, Any]], docs: List[Preprocessed]) -> List[Dict[str, Any]]:
+    """
+    Normalize several auctions, logging once for the batch.
+    
+    Args:
+        records: Raw auction data dictionaries
+        docs: Preprocessed text of each auction
+    
+    Returns:
+        Normalized data dictionaries, in input order
+    """
+    results = [_normalize(data, doc) for data, doc in zip(records, docs)]
+    logger.debug("texts_normalized", count=len(results))
+    return results
+
+
+def _normalize(data: Dict[str, Any], doc: Preprocessed) -> Dict[str, Any]:
+    """Normalized data of one auction, without logging."""
     normalized = data.copy()
     
     # Clean text fields
     if 'title' in normalized:
-        normalized['title'] = clean_text(normalized['title'])
+        normalized['title'] = doc.title
     
     if 'description' in normalized:
-        normalized['description'] = clean_text(normalized['description'])
+        normalized['description'] = doc.description
     
     if 'full_text' in normalized:
-        normalized['full_text'] = clean_text(normalized['full_text'])
+        normalized['full_text'] = doc.full_text
     
     # Extract and normalize numeric fields
     if 'price_text' in normalized:
@@ -132,6 +223,4 @@ def normalize_auction_text(data: Dict[str, Any]) -> Dict[str, Any]:
     if 'rooms' not in normalized or not normalized.get('rooms'):
         normalized['rooms'] = normalize_rooms(full_text)
     
-    logger.debug("text_normalized", auction_id=normalized.get('external_id'))
-    
     return normalized
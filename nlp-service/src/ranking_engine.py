@@ -3,17 +3,18 @@ AI Ranking Engine.
 Calculates convenience score (0-100) for each auction based on multiple factors.
 """
 import yaml
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import structlog
 from pathlib import Path
 
 logger = structlog.get_logger()
 
-# Load configuration
+# Load configuration (libyaml's C loader when PyYAML was built with it)
 CONFIG_PATH = Path("/app/config/config.yaml")
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 if CONFIG_PATH.exists():
     with open(CONFIG_PATH) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
 else:
     # Default configuration
     config = {
@@ -30,6 +31,46 @@ else:
 
 WEIGHTS = config['ranking']['weights']
 
+# City tiers for market value estimates (EUR per sqm)
+PRICE_TIER_1_CITIES = frozenset({'Roma', 'Milano', 'Firenze', 'Bologna', 'Venezia'})
+PRICE_TIER_2_CITIES = frozenset({'Torino', 'Napoli', 'Genova', 'Palermo', 'Bari'})
+
+# Market value multiplier by property type
+TYPE_MULTIPLIERS = {
+    'Appartamento': 1.0,
+    'Villa': 1.3,
+    'Attico': 1.2,
+    'Locale Commerciale': 0.9,
+    'Ufficio': 0.95,
+    'Box': 0.6,
+    'Terreno': 0.3,
+    'Rustico': 0.7,
+}
+
+# City tiers for location desirability
+LOCATION_TIER_1_CITIES = frozenset({'Roma', 'Milano', 'Firenze', 'Bologna', 'Venezia', 'Torino'})
+LOCATION_TIER_2_CITIES = frozenset({'Napoli', 'Genova', 'Palermo', 'Bari', 'Catania', 'Verona'})
+LOCATION_TIER_3_CITIES = frozenset({'Padova', 'Trieste', 'Brescia', 'Parma', 'Modena', 'Reggio Emilia'})
+
+# Resale liquidity by property type
+LIQUIDITY_TYPE_SCORES = {
+    'Appartamento': 90,
+    'Attico': 85,
+    'Villa': 70,
+    'Ufficio': 65,
+    'Locale Commerciale': 60,
+    'Box': 75,
+    'Magazzino': 50,
+    'Terreno': 40,
+    'Rustico': 45,
+}
+
+# Condition keywords, checked best tier first
+EXCELLENT_CONDITION_KEYWORDS = ('ottimo', 'ristrutturato', 'nuovo', 'recente', 'moderno')
+GOOD_CONDITION_KEYWORDS = ('buono', 'abitabile', 'discreto')
+FAIR_CONDITION_KEYWORDS = ('da ristrutturare', 'necessita lavori', 'da ammodernare')
+POOR_CONDITION_KEYWORDS = ('pessimo', 'da demolire', 'rudere', 'collabente')
+
 
 def estimate_market_value(data: Dict[str, Any]) -> float:
     """
@@ -45,29 +86,15 @@ def estimate_market_value(data: Dict[str, Any]) -> float:
     property_type = data.get('property_type', 'Appartamento')
     
     # City tier pricing (EUR per sqm)
-    tier_1_cities = ['Roma', 'Milano', 'Firenze', 'Bologna', 'Venezia']
-    tier_2_cities = ['Torino', 'Napoli', 'Genova', 'Palermo', 'Bari']
-    
-    if city in tier_1_cities:
+    if city in PRICE_TIER_1_CITIES:
         base_price_sqm = 3500
-    elif city in tier_2_cities:
+    elif city in PRICE_TIER_2_CITIES:
         base_price_sqm = 2200
     else:
         base_price_sqm = 1500
     
     # Property type multiplier
-    type_multipliers = {
-        'Appartamento': 1.0,
-        'Villa': 1.3,
-        'Attico': 1.2,
-        'Locale Commerciale': 0.9,
-        'Ufficio': 0.95,
-        'Box': 0.6,
-        'Terreno': 0.3,
-        'Rustico': 0.7,
-    }
-    
-    multiplier = type_multipliers.get(property_type, 1.0)
+    multiplier = TYPE_MULTIPLIERS.get(property_type, 1.0)
     
     estimated_value = surface * base_price_sqm * multiplier
     
@@ -113,53 +140,49 @@ def calculate_location_score(data: Dict[str, Any]) -> float:
     city = data.get('city', '')
     
     # Simple tier-based scoring
-    tier_1 = ['Roma', 'Milano', 'Firenze', 'Bologna', 'Venezia', 'Torino']
-    tier_2 = ['Napoli', 'Genova', 'Palermo', 'Bari', 'Catania', 'Verona']
-    tier_3 = ['Padova', 'Trieste', 'Brescia', 'Parma', 'Modena', 'Reggio Emilia']
-    
-    if city in tier_1:
+    if city in LOCATION_TIER_1_CITIES:
         return 90.0
-    elif city in tier_2:
+    elif city in LOCATION_TIER_2_CITIES:
         return 75.0
-    elif city in tier_3:
+    elif city in LOCATION_TIER_3_CITIES:
         return 65.0
     else:
         return 50.0
 
 
-def calculate_property_condition_score(data: Dict[str, Any]) -> float:
+def combined_text_lower(data: Dict[str, Any]) -> str:
+    """Lowercased description and full text, as searched by the keyword scores."""
+    return f"{data.get('description', '')} {data.get('full_text', '')}".lower()
+
+
+def calculate_property_condition_score(data: Dict[str, Any], combined: Optional[str] = None) -> float:
     """
     Estimate property condition from description keywords.
+    combined: combined_text_lower(data), if already computed.
     """
-    description = data.get('description', '').lower()
-    full_text = data.get('full_text', '').lower()
-    combined = f"{description} {full_text}"
-    
-    excellent_keywords = ['ottimo', 'ristrutturato', 'nuovo', 'recente', 'moderno']
-    good_keywords = ['buono', 'abitabile', 'discreto']
-    fair_keywords = ['da ristrutturare', 'necessita lavori', 'da ammodernare']
-    poor_keywords = ['pessimo', 'da demolire', 'rudere', 'collabente']
+    if combined is None:
+        combined = combined_text_lower(data)
     
-    if any(kw in combined for kw in excellent_keywords):
+    if any(kw in combined for kw in EXCELLENT_CONDITION_KEYWORDS):
         return 90.0
-    elif any(kw in combined for kw in good_keywords):
+    elif any(kw in combined for kw in GOOD_CONDITION_KEYWORDS):
         return 75.0
-    elif any(kw in combined for kw in fair_keywords):
+    elif any(kw in combined for kw in FAIR_CONDITION_KEYWORDS):
         return 50.0
-    elif any(kw in combined for kw in poor_keywords):
+    elif any(kw in combined for kw in POOR_CONDITION_KEYWORDS):
         return 25.0
     else:
         return 60.0  # Default/unknown
 
 
-def calculate_legal_complexity_score(data: Dict[str, Any]) -> float:
+def calculate_legal_complexity_score(data: Dict[str, Any], combined: Optional[str] = None) -> float:
     """
     Score based on legal complications (occupancy, liens, etc.).
     Lower complexity = higher score.
+    combined: combined_text_lower(data), if already computed.
     """
-    description = data.get('description', '').lower()
-    full_text = data.get('full_text', '').lower()
-    combined = f"{description} {full_text}"
+    if combined is None:
+        combined = combined_text_lower(data)
     
     score = 70.0  # Base score
     
@@ -195,19 +218,7 @@ def calculate_liquidity_score(data: Dict[str, Any]) -> float:
     surface = data.get('surface_sqm', 80)
     
     # Property type liquidity
-    type_scores = {
-        'Appartamento': 90,
-        'Attico': 85,
-        'Villa': 70,
-        'Ufficio': 65,
-        'Locale Commerciale': 60,
-        'Box': 75,
-        'Magazzino': 50,
-        'Terreno': 40,
-        'Rustico': 45,
-    }
-    
-    base_score = type_scores.get(property_type, 60)
+    base_score = LIQUIDITY_TYPE_SCORES.get(property_type, 60)
     
     # Size preference (optimal 60-120 sqm for apartments)
     if property_type == 'Appartamento':
@@ -223,21 +234,16 @@ def calculate_liquidity_score(data: Dict[str, Any]) -> float:
     return min(100, base_score)
 
 
-def calculate_ai_score(data: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
-    """
-    Calculate overall AI convenience score (0-100).
-    
-    Args:
-        data: Normalized auction data
+def _score(data: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+    """Overall score and breakdown for one auction, without logging."""
+    # Lowercase the text once for both keyword-based scores
+    combined = combined_text_lower(data)
     
-    Returns:
-        Tuple of (overall_score, score_breakdown)
-    """
     # Calculate individual component scores
     price_score = calculate_price_discount_score(data)
     location_score = calculate_location_score(data)
-    condition_score = calculate_property_condition_score(data)
-    legal_score = calculate_legal_complexity_score(data)
+    condition_score = calculate_property_condition_score(data, combined)
+    legal_score = calculate_legal_complexity_score(data, combined)
     liquidity_score = calculate_liquidity_score(data)
     
     # Weighted average
@@ -260,12 +266,51 @@ def calculate_ai_score(data: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
         'liquidity_potential': round(liquidity_score, 2),
     }
     
-    logger.info(
+    return round(overall_score, 2), breakdown
+
+
+def calculate_ai_score(data: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+    """
+    Calculate overall AI convenience score (0-100).
+    
+    Args:
+        data: Normalized auction data
+    
+    Returns:
+        Tuple of (overall_score, score_breakdown)
+    """
+    overall_score, breakdown = _score(data)
+    
+    logger.debug(
         "score_calculated",
         auction_id=data.get('external_id'),
-        overall_score=round(overall_score, 2),
-        price_score=round(price_score, 2),
-        location_score=round(location_score, 2)
+        overall_score=overall_score,
+        price_score=breakdown['price_discount'],
+        location_score=breakdown['location_score']
     )
     
-    return round(overall_score, 2), breakdown
+    return overall_score, breakdown
+
+
+def calculate_ai_scores(records: List[Dict[str, Any]]) -> List[Tuple[float, Dict[str, float]]]:
+    """
+    Calculate AI convenience scores for several auctions.
+    
+    Same scores as calculate_ai_score, with one log event for the batch.
+    
+    Args:
+        records: Normalized auction data
+    
+    Returns:
+        Tuples of (overall_score, score_breakdown), in input order
+    """
+    results = [_score(data) for data in records]
+    
+    if results:
+        logger.info(
+            "scores_calculated",
+            count=len(results),
+            mean_score=round(sum(score for score, _ in results) / len(results), 2)
+        )
+    
+    return results
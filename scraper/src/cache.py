@@ -0,0 +1,50 @@
+"""
+Redis-backed cache for scraped pages.
+Redis errors are logged and treated as cache misses, so scraping goes on
+against the live site when the cache is unavailable.
+"""
+import json
+from typing import Any, Optional
+import redis.asyncio as redis
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+# Connections are opened lazily on first use
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Get a JSON value from the cache.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Decoded value, or None on miss or Redis error
+    """
+    try:
+        raw = await redis_client.get(key)
+    except Exception as e:
+        logger.warning("cache_get_failed", key=key, error=str(e))
+        return None
+
+    return json.loads(raw) if raw is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl_seconds: int) -> None:
+    """
+    Store a JSON-serializable value in the cache.
+
+    Args:
+        key: Cache key
+        value: Value to store
+        ttl_seconds: Expiration time in seconds
+    """
+    try:
+        await redis_client.set(key, json.dumps(value), ex=ttl_seconds)
+    except Exception as e:
+        logger.warning("cache_set_failed", key=key, error=str(e))
@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     SCRAPER_RUN_INTERVAL_MINUTES: int = 30  # Run ogni 30 minuti
     
     REDIS_URL: str = "redis://redis:6379/0"
+    SCRAPER_DETAIL_CACHE_TTL: int = 86400  # Pagine di dettaglio in cache per 24 ore
     NLP_SERVICE_URL: str = "http://nlp-service:8001"
     BACKEND_API_URL: str = "http://backend:8000"
     
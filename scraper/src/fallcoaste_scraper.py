@@ -4,27 +4,90 @@ Extracts Italian judicial auction data and normalizes it.
 """
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
+import httpx
+import orjson
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import structlog
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import Callable, List, Dict, Any, Optional, Sequence
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import re
 import random
 
 from .config import settings
 from .rate_limiter import RateLimiter
-from .publisher import publish_auction_data
-from .matching_utils import find_best_match, enrich_pvp_auction
+from .cache import cache_get, cache_set
+from .publisher import publish_auction_data_batch
+from .matching_utils import build_pvp_index, find_best_match, find_match_before_details, enrich_pvp_auction
 
 logger = structlog.get_logger()
 
+# Lexbor returns a plain selector list grouped per selector; :is() keeps
+# matches in document order
+DETAIL_FIELD_SELECTOR = ':is(dt, dd)'
+RESULT_ITEM_SELECTOR = 'div:is([class*="result"], [class*="auction"], [class*="item"], [class*="card"])'
+RESULT_LINK_SELECTOR = 'a[href*="vendita/"]'
+TITLE_SELECTOR = ':is(h2, h3, h4, a)'
+
+AUCTION_ID_PATTERN = re.compile(r'-(\d+)\.html')
+PRICE_STRIP_PATTERN = re.compile(r'[€.,\s]')
+PVP_ID_PATTERN = re.compile(r'idAnnuncio[=:](\d+)')
+PRICE_TEXT_PATTERN = re.compile(r'Prezzo base|€')
+DATE_TEXT_PATTERN = re.compile(r'Inizio|Termine|Data')
+TRIBUNAL_TEXT_PATTERN = re.compile(r'Tribunale')
+
+# Matching fields that merge_detail_data() can still change; a PVP match
+# this good on the list-page fields alone makes the detail page unnecessary
+DETAIL_MATCH_FIELDS = ('court', 'auction_date')
+DETAIL_SKIP_MATCH_SCORE = 0.9
+
+# Aste inviate al servizio NLP con una sola richiesta /process-batch
+PUBLISH_BATCH_SIZE = 50
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delay or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def find_texts(node: LexborNode, patterns: Sequence[re.Pattern]) -> List[Optional[str]]:
+    """
+    Return, for each pattern, the first text node under node that matches it.
+    
+    The subtree is walked once for all patterns, stopping as soon as every
+    pattern has a match.
+    """
+    found: List[Optional[str]] = [None] * len(patterns)
+    missing = len(patterns)
+    for child in node.traverse(include_text=True):
+        if child.tag != '-text':
+            continue
+        text = child.text_content
+        for i, pattern in enumerate(patterns):
+            if found[i] is None and pattern.search(text):
+                found[i] = text
+                missing -= 1
+        if not missing:
+            break
+    return found
+
 
 async def fetch_pvp_auctions_from_backend() -> List[Dict[str, Any]]:
     """Fetch all PVP auctions from backend for matching."""
     try:
         async with aiohttp.ClientSession() as session:
             # Fetch from backend API
-            url = f"{settings.BACKEND_URL}/api/v1/auctions"
+            url = f"{settings.BACKEND_API_URL}/api/v1/auctions"
             params = {
                 'limit': 10000,  # Get all auctions
                 'source': 'pvp'  # Only PVP auctions (source of truth)
@@ -32,7 +95,7 @@ async def fetch_pvp_auctions_from_backend() -> List[Dict[str, Any]]:
             
             async with session.get(url, params=params) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     auctions = data.get('items', [])
                     logger.info("fetched_pvp_auctions_for_matching", count=len(auctions))
                     return auctions
@@ -49,72 +112,81 @@ class FallcoasteScraper:
     def __init__(self):
         self.rate_limiter = RateLimiter(
             requests_per_minute=15,  # Conservativo per rispettare il server
-            delay_ms=settings.SCRAPER_DELAY_MS
+            delay_ms=settings.SCRAPER_DELAY_MS,
+            max_delay_ms=settings.SCRAPER_PAUSE_AFTER_ERROR * 1000  # Ritmo minimo sotto throttling
         )
         self.base_url = "https://www.fallcoaste.it"
         self.search_url = f"{self.base_url}/ricerca.html"
         self.session = None
         self.max_retries = 5
-        self.base_backoff = 2
     
     async def __aenter__(self):
         """Async context manager entry."""
-        timeout = aiohttp.ClientTimeout(
-            total=60,
+        timeout = httpx.Timeout(
+            60,
             connect=10,
-            sock_read=30
+            read=30
         )
         
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
             "DNT": "1",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
             "Sec-Fetch-Dest": "document",
             "Sec-Fetch-Mode": "navigate",
             "Sec-Fetch-Site": "none",
         }
         
-        connector = aiohttp.TCPConnector(
-            limit=2,
-            limit_per_host=1,
-            ttl_dns_cache=300,
-            ssl=False
+        # HTTP/2 multiplexes the concurrent detail fetches over one
+        # connection; if the server only speaks HTTP/1.1, up to
+        # SCRAPER_CONCURRENCY keep-alive connections are used instead
+        limits = httpx.Limits(
+            max_connections=settings.SCRAPER_CONCURRENCY,
+            max_keepalive_connections=settings.SCRAPER_CONCURRENCY,
+            keepalive_expiry=300
         )
         
-        self.session = aiohttp.ClientSession(
+        # Accept-Encoding and keep-alive are left to httpx (HTTP/2 forbids
+        # the Connection header); redirects are followed as aiohttp did
+        self.session = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
             timeout=timeout,
             headers=headers,
-            connector=connector
+            limits=limits,
+            verify=False
         )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
         if self.session:
-            await self.session.close()
+            await self.session.aclose()
     
     async def fetch_page(self, page: int = 1) -> Optional[str]:
         """
         Fetch HTML page from Fallcoaste with retry logic.
         
+        Retries are paced by the adaptive rate limiter: 429/5xx responses,
+        timeouts and connection errors cut the request rate (honouring
+        Retry-After), successes raise it again.
+        
         Args:
             page: Page number to fetch
             
         Returns:
             HTML content or None if all retries failed
         """
-        await self.rate_limiter.wait(self.base_url)
-        
         params = {
             "filter": "macro|527^input_categoria|Beni Immobili^ubicazione_dst|50^stato|1",
             "page": str(page)
         }
         
         for attempt in range(self.max_retries):
+            await self.rate_limiter.wait(self.base_url)
+            
             try:
                 logger.info(
                     "fallcoaste_request_attempt",
@@ -127,46 +199,44 @@ class FallcoasteScraper:
                     jitter = random.uniform(0, 1)
                     await asyncio.sleep(jitter)
                 
-                async with self.session.get(self.search_url, params=params) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        logger.info("fallcoaste_fetch_success", page=page, attempt=attempt + 1)
-                        return html
-                    elif response.status == 429:
-                        wait_time = self.base_backoff * (2 ** attempt) + random.uniform(0, 1)
-                        logger.warning(
-                            "fallcoaste_rate_limited",
-                            page=page,
-                            wait_time=wait_time
-                        )
-                        await asyncio.sleep(wait_time)
-                    elif response.status >= 500:
-                        wait_time = self.base_backoff * (2 ** attempt)
-                        logger.warning(
-                            "fallcoaste_server_error",
-                            page=page,
-                            status=response.status,
-                            wait_time=wait_time
-                        )
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logger.error("fallcoaste_unexpected_status", page=page, status=response.status)
-                        await asyncio.sleep(self.base_backoff * (2 ** attempt))
-                        
-            except asyncio.TimeoutError:
-                wait_time = self.base_backoff * (2 ** attempt) + random.uniform(0, 2)
-                logger.warning("fallcoaste_timeout", page=page, wait_time=wait_time)
-                await asyncio.sleep(wait_time)
+                response = await self.session.get(self.search_url, params=params)
+                if response.status_code == 200:
+                    self.rate_limiter.record_success(self.base_url)
+                    html = response.text
+                    logger.info("fallcoaste_fetch_success", page=page, attempt=attempt + 1)
+                    return html
+                elif response.status_code == 429 or response.status_code >= 500:
+                    retry_after = retry_after_seconds(response)
+                    self.rate_limiter.record_throttled(self.base_url, retry_after)
+                    logger.warning(
+                        "fallcoaste_rate_limited" if response.status_code == 429 else "fallcoaste_server_error",
+                        page=page,
+                        status=response.status_code,
+                        retry_after=retry_after,
+                        rate=round(self.rate_limiter.rate(self.base_url), 4)
+                    )
+                else:
+                    logger.error("fallcoaste_unexpected_status", page=page, status=response.status_code)
+                    
+            except httpx.TimeoutException:
+                self.rate_limiter.record_throttled(self.base_url)
+                logger.warning(
+                    "fallcoaste_timeout",
+                    page=page,
+                    rate=round(self.rate_limiter.rate(self.base_url), 4)
+                )
                 
-            except aiohttp.ClientError as e:
-                wait_time = self.base_backoff * (2 ** attempt) + random.uniform(0, 2)
-                logger.warning("fallcoaste_client_error", page=page, error=str(e), wait_time=wait_time)
-                await asyncio.sleep(wait_time)
+            except httpx.HTTPError as e:
+                self.rate_limiter.record_throttled(self.base_url)
+                logger.warning(
+                    "fallcoaste_client_error",
+                    page=page,
+                    error=str(e),
+                    rate=round(self.rate_limiter.rate(self.base_url), 4)
+                )
                 
             except Exception as e:
                 logger.error("fallcoaste_unexpected_error", page=page, error=str(e))
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.base_backoff * (2 ** attempt))
         
         logger.error("fallcoaste_fetch_failed_all_retries", page=page)
         return None
@@ -175,35 +245,63 @@ class FallcoasteScraper:
         """
         Fetch and parse detail page for an auction.
         
+        Parsed pages are cached in Redis by auction ID for
+        SCRAPER_DETAIL_CACHE_TTL seconds; a cache hit makes no request.
+        
         Args:
             detail_url: URL of the auction detail page
             
         Returns:
             Dictionary with detailed auction data or None
         """
+        external_id = self.extract_id_from_url(detail_url)
+        cache_key = f"fallcoaste:detail:{external_id}" if external_id else None
+        if cache_key:
+            cached = await cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
         await self.rate_limiter.wait(self.base_url)
         
         try:
-            async with self.session.get(detail_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    return self.parse_detail_page(html)
-                else:
-                    logger.warning("fallcoaste_detail_fetch_failed", url=detail_url, status=response.status)
-                    return None
+            response = await self.session.get(detail_url)
+            if response.status_code == 200:
+                self.rate_limiter.record_success(self.base_url)
+                details = self.parse_detail_page(response.text)
+                if details is not None and cache_key:
+                    await cache_set(cache_key, details, settings.SCRAPER_DETAIL_CACHE_TTL)
+                return details
+            
+            if response.status_code == 429 or response.status_code >= 500:
+                self.rate_limiter.record_throttled(self.base_url, retry_after_seconds(response))
+            logger.warning("fallcoaste_detail_fetch_failed", url=detail_url, status=response.status_code)
+            return None
+        except httpx.TimeoutException:
+            self.rate_limiter.record_throttled(self.base_url)
+            logger.warning("fallcoaste_detail_timeout", url=detail_url)
+            return None
+        except httpx.HTTPError as e:
+            self.rate_limiter.record_throttled(self.base_url)
+            logger.warning("fallcoaste_detail_client_error", url=detail_url, error=str(e))
+            return None
         except Exception as e:
             logger.error("fallcoaste_detail_fetch_error", url=detail_url, error=str(e))
             return None
     
+    async def fetch_detail_page_bounded(self, semaphore: asyncio.Semaphore, detail_url: str) -> Optional[Dict[str, Any]]:
+        """fetch_detail_page, holding semaphore while the request is in flight."""
+        async with semaphore:
+            return await self.fetch_detail_page(detail_url)
+    
     def parse_detail_page(self, html: str) -> Optional[Dict[str, Any]]:
         """Parse auction detail page to extract all fields."""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = LexborHTMLParser(html)
             details = {}
             
             # Trova tutti i campi strutturati
-            for row in soup.find_all(['dt', 'dd']):
-                text = row.get_text(strip=True)
+            for row in tree.css(DETAIL_FIELD_SELECTOR):
+                text = row.text(strip=True)
                 if ':' in text:
                     key, value = text.split(':', 1)
                     key = key.strip()
@@ -217,7 +315,7 @@ class FallcoasteScraper:
     
     def extract_id_from_url(self, url: str) -> Optional[str]:
         """Extract auction ID from URL."""
-        match = re.search(r'-(\d+)\.html', url)
+        match = AUCTION_ID_PATTERN.search(url)
         if match:
             return f"fallcoaste_{match.group(1)}"
         return None
@@ -226,7 +324,7 @@ class FallcoasteScraper:
         """Extract numeric price from text."""
         try:
             # Rimuovi simboli e converti
-            price_clean = re.sub(r'[€.,\s]', '', price_text)
+            price_clean = PRICE_STRIP_PATTERN.sub('', price_text)
             price_clean = price_clean.replace(',', '.')
             return float(price_clean) if price_clean else None
         except:
@@ -234,33 +332,54 @@ class FallcoasteScraper:
     
     def extract_pvp_id(self, text: str) -> Optional[str]:
         """Extract ID inserzione PVP from text or link."""
-        match = re.search(r'idAnnuncio[=:](\d+)', text)
+        match = PVP_ID_PATTERN.search(text)
         if match:
             return match.group(1)
         return None
     
-    async def parse_auction_list(self, html: str) -> List[Dict[str, Any]]:
-        """Parse HTML to extract auction listings."""
+    async def parse_auction_list(
+        self,
+        html: str,
+        skip_detail: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse HTML to extract auction listings.
+        
+        The list page is parsed first; the detail pages of the listings are
+        then fetched concurrently and merged in.
+        
+        Args:
+            html: List page HTML
+            skip_detail: Called with each listing's list-page fields; listings
+                for which it returns True are not given a detail fetch
+        
+        Returns:
+            Parsed auctions
+        """
+        listings = []
         auctions = []
         
+        # Stesso istante di scraping per tutte le aste della pagina
+        scraped_at = datetime.utcnow().isoformat()
+        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = LexborHTMLParser(html)
             
             # Trova tutti i risultati (adatta il selettore alla struttura reale)
-            auction_items = soup.find_all('div', class_=re.compile(r'result|auction|item|card'))
+            auction_items = tree.css(RESULT_ITEM_SELECTOR)
             
             if not auction_items:
                 # Fallback: cerca link con pattern comune
-                auction_items = soup.find_all('a', href=re.compile(r'(avviso-vendita|vendita)/'))
+                auction_items = tree.css(RESULT_LINK_SELECTOR)
             
             for item in auction_items:
                 try:
                     # Estrai link dettaglio
-                    link_tag = item.find('a', href=True) if item.name != 'a' else item
+                    link_tag = item.css_first('a[href]') if item.tag != 'a' else item
                     if not link_tag:
                         continue
                     
-                    detail_url = link_tag['href']
+                    detail_url = link_tag.attributes['href'] or ""
                     if not detail_url.startswith('http'):
                         detail_url = f"{self.base_url}{detail_url}"
                     
@@ -270,12 +389,16 @@ class FallcoasteScraper:
                         continue
                     
                     # Estrai titolo
-                    title_tag = item.find(['h2', 'h3', 'h4', 'a'])
-                    title = title_tag.get_text(strip=True) if title_tag else "Immobile all'asta"
+                    title_tag = item.css_first(TITLE_SELECTOR)
+                    title = title_tag.text(strip=True) if title_tag else "Immobile all'asta"
+                    
+                    # Prezzo, data e tribunale in un solo passaggio sul testo
+                    price_tag, date_tag, tribunal_tag = find_texts(
+                        item, (PRICE_TEXT_PATTERN, DATE_TEXT_PATTERN, TRIBUNAL_TEXT_PATTERN)
+                    )
                     
                     # Estrai prezzo base
                     price_text = ""
-                    price_tag = item.find(text=re.compile(r'Prezzo base|€'))
                     if price_tag:
                         price_text = price_tag.strip()
                         base_price = self.extract_price(price_text)
@@ -284,21 +407,16 @@ class FallcoasteScraper:
                     
                     # Estrai data vendita/inizio
                     date_text = ""
-                    date_tag = item.find(text=re.compile(r'Inizio|Termine|Data'))
                     if date_tag:
                         date_text = date_tag.strip()
                     
                     # Estrai tribunale
                     tribunal_text = ""
-                    tribunal_tag = item.find(text=re.compile(r'Tribunale'))
                     if tribunal_tag:
                         tribunal_text = tribunal_tag.strip()
                     
-                    # Fetch detail page per dati completi
-                    detail_data = await self.fetch_detail_page(detail_url)
-                    
-                    # Combina dati base con dettagli
-                    auction_data = {
+                    # Dati base dalla lista
+                    listings.append({
                         'external_id': external_id,
                         'title': title[:500],  # Limita lunghezza
                         'url': detail_url,
@@ -307,69 +425,28 @@ class FallcoasteScraper:
                         'price_text': price_text,
                         'auction_date': date_text,
                         'court': tribunal_text,
-                        'scraped_at': datetime.utcnow().isoformat(),
-                    }
+                        'scraped_at': scraped_at,
+                    })
                     
+                except Exception as e:
+                    logger.warning("fallcoaste_parse_item_failed", error=str(e))
+                    continue
+            
+            # Fetch detail page per dati completi: in parallelo, fino a
+            # SCRAPER_CONCURRENCY alla volta (il rate limiter distanzia le richieste)
+            needs_detail = [skip_detail is None or not skip_detail(auction_data) for auction_data in listings]
+            semaphore = asyncio.Semaphore(settings.SCRAPER_CONCURRENCY)
+            fetched = iter(await asyncio.gather(*(
+                self.fetch_detail_page_bounded(semaphore, auction_data['url'])
+                for auction_data, needed in zip(listings, needs_detail) if needed
+            )))
+            details = [next(fetched) if needed else None for needed in needs_detail]
+            
+            for auction_data, detail_data in zip(listings, details):
+                try:
                     # Aggiungi dettagli se disponibili
                     if detail_data:
-                        # Procedura n.
-                        if 'Procedura n' in detail_data:
-                            auction_data['case_number'] = detail_data['Procedura n']
-                        
-                        # Tipo procedura
-                        if 'Tipo procedura' in detail_data:
-                            auction_data['procedure_type'] = detail_data['Tipo procedura']
-                        
-                        # Tribunale
-                        if 'Tribunale' in detail_data:
-                            auction_data['court'] = detail_data['Tribunale']
-                        
-                        # Referente procedura
-                        if 'Referente procedura' in detail_data:
-                            auction_data['referent'] = detail_data['Referente procedura']
-                        
-                        # Termine presentazione offerte
-                        if 'Termine presentazione offerte' in detail_data:
-                            auction_data['offer_deadline'] = detail_data['Termine presentazione offerte']
-                        
-                        # Termine visita
-                        if 'Termine visita' in detail_data:
-                            auction_data['visit_deadline'] = detail_data['Termine visita']
-                        
-                        # Data vendita
-                        if 'Data vendita' in detail_data:
-                            auction_data['auction_date'] = detail_data['Data vendita']
-                        
-                        # ID inserzione PVP
-                        pvp_id = None
-                        if 'ID inserzione PVP' in detail_data:
-                            pvp_id = detail_data['ID inserzione PVP']
-                        elif 'Link inserzione ministeriale' in detail_data:
-                            pvp_id = self.extract_pvp_id(detail_data['Link inserzione ministeriale'])
-                        
-                        if pvp_id:
-                            auction_data['pvp_id'] = pvp_id
-                            # Genera link PVP se disponibile
-                            auction_data['pvp_url'] = f"https://pvp.giustizia.it/pvp/it/dettaglio.page?idAnnuncio={pvp_id}"
-                        
-                        # Codice vendita
-                        if 'Codice vendita' in detail_data:
-                            auction_data['sale_code'] = detail_data['Codice vendita']
-                        
-                        # Data pubblicazione
-                        if 'Data pubblicazione' in detail_data:
-                            auction_data['publication_date'] = detail_data['Data pubblicazione']
-                        
-                        # Cauzione minima
-                        if 'Cauzione minima' in detail_data:
-                            auction_data['minimum_deposit'] = self.extract_price(detail_data['Cauzione minima'])
-                        
-                        # Annotazioni PVP
-                        if 'Annotazioni PVP' in detail_data:
-                            auction_data['pvp_notes'] = detail_data['Annotazioni PVP']
-                        
-                        # Raw details per debugging
-                        auction_data['raw_data'] = detail_data
+                        self.merge_detail_data(auction_data, detail_data)
                     
                     # Normalizza property_type (default se non disponibile)
                     auction_data['property_type'] = 'Immobile'
@@ -380,13 +457,74 @@ class FallcoasteScraper:
                     logger.warning("fallcoaste_parse_item_failed", error=str(e))
                     continue
             
-            logger.info("fallcoaste_parsed_page", count=len(auctions))
+            logger.info("fallcoaste_parsed_page", count=len(auctions), detail_pages=sum(needs_detail))
             return auctions
             
         except Exception as e:
             logger.error("fallcoaste_parse_page_failed", error=str(e))
             return []
     
+    def merge_detail_data(self, auction_data: Dict[str, Any], detail_data: Dict[str, Any]) -> None:
+        """Add the fields of a parsed detail page to a listing, in place."""
+        # Procedura n.
+        if 'Procedura n' in detail_data:
+            auction_data['case_number'] = detail_data['Procedura n']
+        
+        # Tipo procedura
+        if 'Tipo procedura' in detail_data:
+            auction_data['procedure_type'] = detail_data['Tipo procedura']
+        
+        # Tribunale
+        if 'Tribunale' in detail_data:
+            auction_data['court'] = detail_data['Tribunale']
+        
+        # Referente procedura
+        if 'Referente procedura' in detail_data:
+            auction_data['referent'] = detail_data['Referente procedura']
+        
+        # Termine presentazione offerte
+        if 'Termine presentazione offerte' in detail_data:
+            auction_data['offer_deadline'] = detail_data['Termine presentazione offerte']
+        
+        # Termine visita
+        if 'Termine visita' in detail_data:
+            auction_data['visit_deadline'] = detail_data['Termine visita']
+        
+        # Data vendita
+        if 'Data vendita' in detail_data:
+            auction_data['auction_date'] = detail_data['Data vendita']
+        
+        # ID inserzione PVP
+        pvp_id = None
+        if 'ID inserzione PVP' in detail_data:
+            pvp_id = detail_data['ID inserzione PVP']
+        elif 'Link inserzione ministeriale' in detail_data:
+            pvp_id = self.extract_pvp_id(detail_data['Link inserzione ministeriale'])
+        
+        if pvp_id:
+            auction_data['pvp_id'] = pvp_id
+            # Genera link PVP se disponibile
+            auction_data['pvp_url'] = f"https://pvp.giustizia.it/pvp/it/dettaglio.page?idAnnuncio={pvp_id}"
+        
+        # Codice vendita
+        if 'Codice vendita' in detail_data:
+            auction_data['sale_code'] = detail_data['Codice vendita']
+        
+        # Data pubblicazione
+        if 'Data pubblicazione' in detail_data:
+            auction_data['publication_date'] = detail_data['Data pubblicazione']
+        
+        # Cauzione minima
+        if 'Cauzione minima' in detail_data:
+            auction_data['minimum_deposit'] = self.extract_price(detail_data['Cauzione minima'])
+        
+        # Annotazioni PVP
+        if 'Annotazioni PVP' in detail_data:
+            auction_data['pvp_notes'] = detail_data['Annotazioni PVP']
+        
+        # Raw details per debugging
+        auction_data['raw_data'] = detail_data
+    
     async def run(self, max_pages: int = 10, enrichment_mode: bool = True):
         """
         Main scraping loop for Fallcoaste.
@@ -410,11 +548,41 @@ class FallcoasteScraper:
                 logger.warning("no_pvp_auctions_found", message="Cannot enrich without PVP data, skipping")
                 return
         
+        # Indice per data e prezzo: il fuzzy matching gira solo sui candidati
+        pvp_index = build_pvp_index(pvp_auctions)
+        
         total_auctions = 0
         total_enrichments = 0
         consecutive_failures = 0
         max_consecutive_failures = 3
         
+        # Outcomes already decided on list-page fields, by external_id
+        prematched = {}
+        
+        # Auctions waiting to be published, flushed every PUBLISH_BATCH_SIZE
+        publish_buffer = []
+        
+        async def flush_publish_buffer():
+            """Publish the buffered auctions in one batch request."""
+            if publish_buffer:
+                batch = publish_buffer[:]
+                publish_buffer.clear()
+                await publish_auction_data_batch(batch)
+        
+        def decided_without_detail(auction: Dict[str, Any]) -> bool:
+            """True if the detail page cannot change whether the listing matches."""
+            match_result, decided = find_match_before_details(
+                auction,
+                pvp_auctions,
+                DETAIL_MATCH_FIELDS,
+                min_score=0.7,
+                confident_score=DETAIL_SKIP_MATCH_SCORE,
+                pvp_index=pvp_index
+            )
+            if decided:
+                prematched[auction['external_id']] = match_result
+            return decided
+        
         for page in range(1, max_pages + 1):
             try:
                 # Fetch HTML page
@@ -440,7 +608,10 @@ class FallcoasteScraper:
                     continue
                 
                 # Parse auctions
-                auctions = await self.parse_auction_list(html)
+                auctions = await self.parse_auction_list(
+                    html,
+                    skip_detail=decided_without_detail if enrichment_mode else None
+                )
                 
                 if not auctions:
                     consecutive_failures += 1
@@ -466,7 +637,10 @@ class FallcoasteScraper:
                         
                         if enrichment_mode:
                             # ENRICHMENT MODE: Find and enrich matching PVP auction
-                            match_result = find_best_match(auction, pvp_auctions, min_score=0.7)
+                            if auction['external_id'] in prematched:
+                                match_result = prematched[auction['external_id']]
+                            else:
+                                match_result = find_best_match(auction, pvp_auctions, min_score=0.7, pvp_index=pvp_index)
                             
                             if match_result:
                                 pvp_auction, confidence = match_result
@@ -475,7 +649,7 @@ class FallcoasteScraper:
                                 enriched = enrich_pvp_auction(pvp_auction, auction, confidence)
                                 
                                 # Publish enriched auction (will update existing record)
-                                await publish_auction_data(enriched)
+                                publish_buffer.append(enriched)
                                 total_enrichments += 1
                                 
                                 logger.info(
@@ -495,7 +669,7 @@ class FallcoasteScraper:
                                 )
                         else:
                             # STANDALONE MODE: Create new auction record (not recommended)
-                            await publish_auction_data(auction)
+                            publish_buffer.append(auction)
                             logger.debug("fallcoaste_created_new_auction", auction_id=auction.get('external_id'))
                     
                     except Exception as e:
@@ -504,6 +678,9 @@ class FallcoasteScraper:
                             auction_id=auction.get('external_id'),
                             error=str(e)
                         )
+                    
+                    if len(publish_buffer) >= PUBLISH_BATCH_SIZE:
+                        await flush_publish_buffer()
                 
                 # Polite delay between pages
                 base_delay = settings.SCRAPER_DELAY_MS / 1000.0
@@ -532,6 +709,8 @@ class FallcoasteScraper:
                 await asyncio.sleep(wait_time)
                 continue
         
+        await flush_publish_buffer()
+        
         if enrichment_mode:
             enrichment_rate = (total_enrichments / total_auctions * 100) if total_auctions > 0 else 0
             logger.info(
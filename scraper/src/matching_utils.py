@@ -2,8 +2,9 @@
 Fuzzy matching utilities for auction data enrichment.
 Matches Fallcoaste data with PVP auctions based on multiple criteria.
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from difflib import SequenceMatcher
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 import structlog
 
@@ -74,6 +75,130 @@ def prices_match(price1: Optional[float], price2: Optional[float], tolerance_per
     return diff_percent <= tolerance_percent
 
 
+# Weight of each matched field in the overall score
+MATCH_WEIGHTS = {
+    'address': 0.30,
+    'court': 0.25,
+    'auction_date': 0.25,
+    'base_price': 0.20,
+}
+
+
+# Fields scored by string similarity rather than by tolerance windows
+FUZZY_MATCH_FIELDS = ('address', 'court')
+
+
+def fuzzy_field_score(pvp_auction: Dict[str, Any], fallcoaste_auction: Dict[str, Any], field: str) -> float:
+    """Weighted similarity of one FUZZY_MATCH_FIELDS field, as in match_score_components."""
+    if field == 'address':
+        pvp_value = f"{pvp_auction.get('address', '')} {pvp_auction.get('city', '')}"
+    else:
+        pvp_value = pvp_auction.get(field, '')
+    
+    return similarity_ratio(pvp_value, fallcoaste_auction.get(field, '')) * MATCH_WEIGHTS[field]
+
+
+def match_score_components(pvp_auction: Dict[str, Any], fallcoaste_auction: Dict[str, Any]) -> Dict[str, float]:
+    """Weighted contribution of each field to calculate_match_score, keyed as MATCH_WEIGHTS."""
+    # 1-2. Address and court similarity
+    address_score = fuzzy_field_score(pvp_auction, fallcoaste_auction, 'address')
+    court_score = fuzzy_field_score(pvp_auction, fallcoaste_auction, 'court')
+    
+    # 3. Auction date match
+    pvp_date = pvp_auction.get('auction_date', '')
+    fallcoaste_date = fallcoaste_auction.get('auction_date', '')
+    
+    date_match = dates_match(pvp_date, fallcoaste_date, tolerance_days=7)
+    
+    # 4. Price match
+    pvp_price = pvp_auction.get('base_price')
+    fallcoaste_price = fallcoaste_auction.get('base_price')
+    
+    price_match = prices_match(pvp_price, fallcoaste_price, tolerance_percent=5.0)
+    
+    return {
+        'address': address_score,
+        'court': court_score,
+        'auction_date': MATCH_WEIGHTS['auction_date'] if date_match else 0.0,
+        'base_price': MATCH_WEIGHTS['base_price'] if price_match else 0.0,
+    }
+
+
+# dates_match floors the timedelta, so a 7-day tolerance can span 8 calendar days
+DATE_INDEX_WINDOW_DAYS = 8
+PRICE_INDEX_TOLERANCE = 0.05
+
+
+class PvpIndex:
+    """
+    PVP auctions indexed by auction date and base price.
+    
+    A PVP auction that matches neither the date nor the price of a
+    Fallcoaste auction scores at most the address and court weights
+    (0.55), below any usable min_score, so only auctions in the date or
+    price window need fuzzy scoring.
+    """
+    
+    def __init__(self, pvp_auctions: List[Dict[str, Any]]):
+        self.auctions = pvp_auctions
+        self.by_date: List[Tuple[int, int]] = []
+        self.by_price: List[Tuple[float, int]] = []
+        
+        for position, pvp_auction in enumerate(pvp_auctions):
+            auction_date = parse_date(pvp_auction.get('auction_date', ''))
+            if auction_date:
+                self.by_date.append((auction_date.toordinal(), position))
+            
+            price = pvp_auction.get('base_price')
+            if isinstance(price, (int, float)) and price:
+                self.by_price.append((float(price), position))
+        
+        self.by_date.sort()
+        self.by_price.sort()
+    
+    def candidates(self, fallcoaste_auction: Dict[str, Any], min_score: float) -> List[int]:
+        """
+        Positions of the PVP auctions that can score min_score, in input order.
+        
+        Args:
+            fallcoaste_auction: Fallcoaste auction to match
+            min_score: Lowest score of interest
+            
+        Returns:
+            Sorted positions in auctions
+        """
+        price = fallcoaste_auction.get('base_price')
+        if (
+            MATCH_WEIGHTS['address'] + MATCH_WEIGHTS['court'] >= min_score
+            or (isinstance(price, (int, float)) and price < 0)
+        ):
+            return list(range(len(self.auctions)))
+        
+        positions = set()
+        
+        auction_date = parse_date(fallcoaste_auction.get('auction_date', ''))
+        if auction_date:
+            day = auction_date.toordinal()
+            start = bisect_left(self.by_date, (day - DATE_INDEX_WINDOW_DAYS, -1))
+            end = bisect_right(self.by_date, (day + DATE_INDEX_WINDOW_DAYS, len(self.auctions)))
+            positions.update(position for _, position in self.by_date[start:end])
+        
+        if price:
+            # Small margin for float rounding at the window edges
+            low = price * (1 - PRICE_INDEX_TOLERANCE) * (1 - 1e-9)
+            high = price / (1 - PRICE_INDEX_TOLERANCE) * (1 + 1e-9)
+            start = bisect_left(self.by_price, (low, -1))
+            end = bisect_right(self.by_price, (high, len(self.auctions)))
+            positions.update(position for _, position in self.by_price[start:end])
+        
+        return sorted(positions)
+
+
+def build_pvp_index(pvp_auctions: List[Dict[str, Any]]) -> PvpIndex:
+    """Index PVP auctions once per run for find_best_match and find_match_before_details."""
+    return PvpIndex(pvp_auctions)
+
+
 def calculate_match_score(pvp_auction: Dict[str, Any], fallcoaste_auction: Dict[str, Any]) -> float:
     """
     Calculate fuzzy match score between PVP and Fallcoaste auctions.
@@ -85,51 +210,26 @@ def calculate_match_score(pvp_auction: Dict[str, Any], fallcoaste_auction: Dict[
     - Data asta (auction date): 25% weight
     - Prezzo base (base price): 20% weight
     """
-    score = 0.0
-    
-    # 1. Address similarity (30%)
-    pvp_address = f"{pvp_auction.get('address', '')} {pvp_auction.get('city', '')}"
-    fallcoaste_address = fallcoaste_auction.get('address', '')
-    
-    address_similarity = similarity_ratio(pvp_address, fallcoaste_address)
-    score += address_similarity * 0.30
-    
-    # 2. Court similarity (25%)
-    pvp_court = pvp_auction.get('court', '')
-    fallcoaste_court = fallcoaste_auction.get('court', '')
-    
-    court_similarity = similarity_ratio(pvp_court, fallcoaste_court)
-    score += court_similarity * 0.25
-    
-    # 3. Auction date match (25%)
-    pvp_date = pvp_auction.get('auction_date', '')
-    fallcoaste_date = fallcoaste_auction.get('auction_date', '')
-    
-    if dates_match(pvp_date, fallcoaste_date, tolerance_days=7):
-        score += 0.25
-    
-    # 4. Price match (20%)
-    pvp_price = pvp_auction.get('base_price')
-    fallcoaste_price = fallcoaste_auction.get('base_price')
-    
-    if prices_match(pvp_price, fallcoaste_price, tolerance_percent=5.0):
-        score += 0.20
-    
-    return score
+    return sum(match_score_components(pvp_auction, fallcoaste_auction).values(), 0.0)
 
 
 def find_best_match(
     fallcoaste_auction: Dict[str, Any],
     pvp_auctions: List[Dict[str, Any]],
-    min_score: float = 0.7
+    min_score: float = 0.7,
+    pvp_index: Optional[PvpIndex] = None
 ) -> Optional[tuple[Dict[str, Any], float]]:
     """
     Find best matching PVP auction for a Fallcoaste auction.
     Returns (pvp_auction, score) if match found above threshold, else None.
+    With pvp_index (built from pvp_auctions) only its candidates are scored.
     """
     best_match = None
     best_score = 0.0
     
+    if pvp_index is not None:
+        pvp_auctions = [pvp_index.auctions[i] for i in pvp_index.candidates(fallcoaste_auction, min_score)]
+    
     for pvp_auction in pvp_auctions:
         score = calculate_match_score(pvp_auction, fallcoaste_auction)
         
@@ -149,6 +249,80 @@ def find_best_match(
     return None
 
 
+def find_match_before_details(
+    fallcoaste_auction: Dict[str, Any],
+    pvp_auctions: List[Dict[str, Any]],
+    pending_fields: Iterable[str],
+    min_score: float = 0.7,
+    confident_score: float = 0.9,
+    pvp_index: Optional[PvpIndex] = None
+) -> Tuple[Optional[tuple[Dict[str, Any], float]], bool]:
+    """
+    Match a Fallcoaste auction whose pending_fields may still change.
+    
+    Returns (match, decided). decided is True when the pending fields
+    cannot change the outcome of find_best_match(min_score): either the
+    known fields already give a match scoring confident_score (returned as
+    match), or no PVP auction could reach min_score even with a perfect
+    score on every pending field (match is None).
+    
+    With pvp_index (built from pvp_auctions) the index candidates are
+    scored first. The rest match neither date nor price, so only their
+    known fuzzy fields are scored, and only when those can close the gap
+    to min_score; the scan stops at the first one that could reach it.
+    """
+    pending_fields = tuple(pending_fields)
+    pending_weight = sum(MATCH_WEIGHTS[field] for field in pending_fields)
+    best_match = None
+    best_score = 0.0
+    best_reachable = 0.0
+    
+    candidates = range(len(pvp_auctions))
+    if pvp_index is not None:
+        pvp_auctions = pvp_index.auctions
+        candidates = pvp_index.candidates(fallcoaste_auction, min_score)
+    
+    for position in candidates:
+        components = match_score_components(pvp_auctions[position], fallcoaste_auction)
+        score = sum(components.values(), 0.0)
+        known = score - sum(components[field] for field in pending_fields)
+        best_reachable = max(best_reachable, known + pending_weight)
+        
+        if score > best_score and score >= min_score:
+            best_score = score
+            best_match = pvp_auctions[position]
+    
+    if best_match and best_score >= confident_score:
+        return (best_match, best_score), True
+    
+    if pvp_index is not None and best_reachable < min_score - 1e-9:
+        # Non-candidates cannot match now, but may once the pending fields are known
+        fuzzy_fields = [
+            field for field in FUZZY_MATCH_FIELDS
+            if field not in pending_fields and fallcoaste_auction.get(field)
+        ]
+        fuzzy_weight = sum(MATCH_WEIGHTS[field] for field in fuzzy_fields)
+        
+        if len(candidates) < len(pvp_auctions):
+            if not fuzzy_fields:
+                best_reachable = max(best_reachable, pending_weight)
+            elif pending_weight + fuzzy_weight >= min_score - 1e-9:
+                scored = set(candidates)
+                for position, pvp_auction in enumerate(pvp_auctions):
+                    if position in scored:
+                        continue
+                    known = sum(
+                        (fuzzy_field_score(pvp_auction, fallcoaste_auction, field) for field in fuzzy_fields),
+                        0.0
+                    )
+                    best_reachable = max(best_reachable, known + pending_weight)
+                    if best_reachable >= min_score - 1e-9:
+                        break
+    
+    # Small margin for float rounding in the bound
+    return None, best_reachable < min_score - 1e-9
+
+
 def enrich_pvp_auction(
     pvp_auction: Dict[str, Any],
     fallcoaste_auction: Dict[str, Any],
@@ -1,7 +1,7 @@
 """Publish scraped data to NLP service."""
 import aiohttp
 import structlog
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from .config import settings
 
@@ -43,3 +43,40 @@ async def publish_auction_data(auction_data: Dict[str, Any]) -> bool:
             auction_id=auction_data.get('external_id')
         )
         return False
+
+
+async def publish_auction_data_batch(auctions: List[Dict[str, Any]]) -> bool:
+    """
+    Publish several auctions to the NLP service in one request.
+    
+    If the service rejects the batch as invalid (422), the auctions are
+    published one by one so a single bad record does not drop the rest.
+    
+    Args:
+        auctions: Scraped auction data
+    
+    Returns:
+        Success boolean (False if any auction was not published)
+    """
+    if not auctions:
+        return True
+    
+    url = f"{settings.NLP_SERVICE_URL}/process-batch"
+    
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, json=auctions) as response:
+                if response.status == 200:
+                    logger.info("data_batch_published", count=len(auctions))
+                    return True
+                
+                logger.error("publish_batch_failed", status=response.status, count=len(auctions))
+                if response.status != 422:
+                    return False
+    
+    except Exception as e:
+        logger.error("publish_batch_error", error=str(e), count=len(auctions))
+        return False
+    
+    results = [await publish_auction_data(auction) for auction in auctions]
+    return all(results)
@@ -104,6 +104,8 @@ class PVPScraper:
         api_response = await self.fetch_api_data(page=page, size=12)
         
         auctions = []
+        # All auctions in a page share the scrape time
+        scraped_at = datetime.utcnow().isoformat()
         # API response structure: {"body": {"content": [...]}}
         body = api_response.get('body', {})
         content = body.get('content', [])
@@ -137,7 +139,7 @@ class PVPScraper:
                     'auction_date': item.get('dataOraVendita', ''),
                     'auction_round': auction_round,
                     'court': item.get('tribunale', ''),
-                    'scraped_at': datetime.utcnow().isoformat(),
+                    'scraped_at': scraped_at,
                     'raw_data': item
                 }
                 
@@ -1,25 +1,89 @@
 """Rate limiter for polite scraping."""
 import asyncio
 import time
-from typing import Dict
+from typing import Dict, Optional
+
+# Adaptive rate control: additive-or-proportional increase on success,
+# multiplicative decrease when the server pushes back
+RATE_INCREASE_FACTOR = 0.1  # alpha: grow by 10% of the current rate (at least min_rate)
+RATE_DECREASE_FACTOR = 0.5  # beta: halve the rate on 429/5xx/timeouts
 
 class RateLimiter:
-    """Token bucket rate limiter."""
+    """
+    Adaptive per-domain rate limiter.
+    
+    Requests to a domain are spaced by 1/rate, starting from one request
+    every delay_ms. Callers report outcomes: record_throttled() cuts the
+    rate (down to one request every max_delay_ms) and honours Retry-After,
+    record_success() raises it back. The configured spacing is a floor:
+    the rate never rises above one request every delay_ms, nor above
+    requests_per_minute. Without those calls the spacing stays fixed at
+    delay_ms.
+    """
     
-    def __init__(self, requests_per_minute: int = 30, delay_ms: int = 1000):
+    def __init__(self, requests_per_minute: int = 30, delay_ms: int = 1000, max_delay_ms: int = 60000):
         self.requests_per_minute = requests_per_minute
         self.delay_ms = delay_ms
+        self.max_delay_ms = max_delay_ms
         self.last_request_time: Dict[str, float] = {}
+        self.rates: Dict[str, float] = {}
+    
+    @property
+    def initial_rate(self) -> float:
+        """Requests per second before any feedback."""
+        return 1000.0 / self.delay_ms
+    
+    @property
+    def max_rate(self) -> float:
+        """Upper bound reached by record_success() (delay_ms and requests_per_minute)."""
+        return min(self.initial_rate, self.requests_per_minute / 60.0)
+    
+    @property
+    def min_rate(self) -> float:
+        """Lower bound reached by record_throttled() (max_delay_ms)."""
+        return 1000.0 / self.max_delay_ms
+    
+    def rate(self, domain: str) -> float:
+        """Current requests per second for a domain."""
+        return self.rates.get(domain, self.initial_rate)
     
     async def wait(self, domain: str):
-        """Wait if necessary to respect rate limits."""
+        """
+        Wait if necessary to respect rate limits.
+        
+        Each caller reserves the next free slot before sleeping, so
+        concurrent callers are spaced by 1/rate instead of waking together.
+        """
         current_time = time.time()
-        last_time = self.last_request_time.get(domain, 0)
-        time_since_last = current_time - last_time
-        min_interval = self.delay_ms / 1000.0
+        min_interval = 1.0 / self.rate(domain)
+        slot = max(current_time, self.last_request_time.get(domain, 0) + min_interval)
+        self.last_request_time[domain] = slot
+        
+        if slot > current_time:
+            await asyncio.sleep(slot - current_time)
+    
+    def record_success(self, domain: str):
+        """Raise the rate after a successful request, up to max_rate."""
+        rate = self.rate(domain)
+        if rate < self.max_rate:
+            step = max(self.min_rate, RATE_INCREASE_FACTOR * rate)
+            self.rates[domain] = min(self.max_rate, rate + step)
+    
+    def record_throttled(self, domain: str, retry_after: Optional[float] = None):
+        """
+        Cut the rate after a 429/5xx/timeout and push back the next slot.
         
-        if time_since_last < min_interval:
-            wait_time = min_interval - time_since_last
-            await asyncio.sleep(wait_time)
+        Args:
+            domain: Domain that throttled
+            retry_after: Seconds from the Retry-After header, if any
+        """
+        rate = max(self.min_rate, RATE_DECREASE_FACTOR * self.rate(domain))
+        self.rates[domain] = rate
         
-        self.last_request_time[domain] = time.time()
+        # Drop the earned headroom: the next request waits a full interval,
+        # or as long as the server asked
+        pause = max(1.0 / rate, retry_after or 0.0)
+        self.last_request_time[domain] = max(
+            self.last_request_time.get(domain, 0),
+            time.time() + pause - 1.0 / rate
+        )